@@ -0,0 +1,21 @@
+'''
+Alphastroid, an asteroids game where the asteroids are letters.
+
+Importing the package has no side effects: pygame is only loaded by the modules that draw, and the window is
+only opened by main(). The simulation (GameState, step) runs without a display.
+
+Usage:
+    python -m alphastroid
+    python -m alphastroid --headless --frames 5000 --seed 3
+'''
+from .simulation import (INPUT_LEFT, INPUT_RIGHT, INPUT_THRUST, INPUT_FIRE, INPUT_DOWN, GameState, step, demo_input,
+                         run_headless)
+from .replay import Recording, ReplayError, replay_headless, verify
+from .snapshot import Snapshot, SnapshotError, Rewind
+
+def main(*args, **kwargs):
+    '''
+    Runs the game in a window until it is closed. Takes the same arguments as alphastroid.game.main().
+    '''
+    from .game import main as run_game # Deferred so importing the package does not load pygame
+    run_game(*args, **kwargs)
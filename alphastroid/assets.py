@@ -0,0 +1,55 @@
+'''
+Lazy loading of the game's images and font.
+
+Nothing is decoded at import time. Each image is loaded, scaled and converted to the display's pixel format
+the first time it is asked for, and then kept, so later blits do not convert pixels on every frame.
+'''
+import os
+import pygame
+
+from .viewport import viewport
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+FONT_PATH = os.path.join(ASSETS_DIR, "Comfortaa-Regular.ttf")
+
+images = {} # Loaded images by (file name, size)
+
+def load_image(name, size, alpha=False):
+    '''
+    Loads, scales and converts an image from the assets folder, reusing it on later calls.
+    
+    Arguments:
+        name (str): File name inside the assets folder.
+        size (tuple): Width and height to scale the image to.
+        alpha (bool): Keep per-pixel transparency.
+    
+    Returns:
+        pygame.Surface: The image, in the display's pixel format when a display mode is set.
+    '''
+    key = (name, size)
+    image = images.get(key)
+    if image is None:
+        image = pygame.transform.scale(pygame.image.load(os.path.join(ASSETS_DIR, name)), size)
+        if pygame.display.get_surface() is not None:
+            # Matching the screen's format turns every later blit into a plain copy
+            image = image.convert_alpha() if alpha else image.convert()
+        images[key] = image
+    return image
+
+def get_nebula_layer():
+    '''
+    Returns the nebula background scaled to the render resolution.
+    '''
+    return load_image("redset-nebula.jpg", viewport.size)
+
+def get_wasd_and_arrow_keys():
+    '''
+    Returns the movement keys picture shown with the instructions.
+    '''
+    return load_image("wasdandarrowkeys.png", (viewport.pixels(400), viewport.pixels(120)), alpha=True)
+
+def get_spacebar_key():
+    '''
+    Returns the spacebar picture shown with the instructions.
+    '''
+    return load_image("spacebarkey.png", (viewport.pixels(200), viewport.pixels(120)), alpha=True)
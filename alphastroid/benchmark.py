@@ -0,0 +1,251 @@
+'''
+Benchmarks for Alphastroid.
+
+Runs scripted stress scenarios without a window and reports mean, p95 and p99 frame times, broken down by
+simulation phase and draw function. Cold start, from launching Python to the first menu frame, is measured in
+fresh processes. Results are printed as JSON and can be saved and compared against an earlier run to catch
+regressions.
+
+Usage:
+    python -m alphastroid.benchmark
+    python -m alphastroid.benchmark --scenario wave_20 --frames 2000 --output results.json
+    python -m alphastroid.benchmark --compare results.json
+    python -m alphastroid.benchmark --world 6000x4000
+    python -m alphastroid.benchmark --scenario swarm --scenario swarm_store --world 6000x4000
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# Benchmarks always run headless
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # Keep stdout pure JSON
+
+from . import entities, simulation, store
+from .config import FPS, SIM_DT, RENDER_SCALE, WORLD_SIZE
+from .profiling import FrameTimer, summarize_times
+from .render import draw_game
+from .viewport import viewport
+from .cli import size_argument
+
+def make_endless(state):
+    '''
+    Keeps the ship invincible so a scenario runs for its full length instead of ending in a game over.
+
+    Arguments:
+        state (GameState): Game to modify.
+    '''
+    state.invincible = True
+    state.invincibility_timer = float('inf')
+    state.first_time_instructions_overlay = False
+
+def setup_wave_1(state):
+    '''
+    A normal first wave.
+    '''
+    make_endless(state)
+
+def setup_wave_20(state):
+    '''
+    Wave 20 with a large asteroid count.
+    '''
+    make_endless(state)
+    state.current_wave = 20
+    state.asteroids.clear()
+    for _ in range(60):
+        entities.create_asteroids(state)
+
+def setup_swarm(state):
+    '''
+    Thousands of asteroids at once, which is what the NumPy EntityStore is for.
+    '''
+    make_endless(state)
+    state.current_wave = 20
+    state.asteroids.clear()
+    for _ in range(SWARM_SIZE):
+        entities.create_asteroids(state)
+
+def setup_fragment_storm(state):
+    '''
+    A wave in progress with lots of ship debris flying around.
+    '''
+    make_endless(state)
+    for _ in range(100):
+        state.ship_fragments.extend(entities.create_fragments(state.ship_pos, state.rng))
+
+def idle_input(frame):
+    '''
+    No keys pressed.
+    '''
+    return 0
+
+def fire_input(frame):
+    '''
+    Constant fire while turning, so every cooldown produces a bullet in a new direction.
+    '''
+    return simulation.INPUT_FIRE | simulation.INPUT_RIGHT
+
+def storm_input(frame):
+    '''
+    Constant fire without moving.
+    '''
+    return simulation.INPUT_FIRE
+
+SWARM_SIZE = 2000 # Asteroids in the swarm scenarios
+
+# Each scenario is (setup function, input function, per-frame hook, GameState keyword arguments)
+SCENARIOS = {
+    'wave_1': (setup_wave_1, idle_input, None, {}),
+    'wave_20': (setup_wave_20, idle_input, None, {}),
+    'bullet_spam': (setup_wave_20, fire_input, None, {}),
+    'fragment_storm': (setup_fragment_storm, storm_input,
+                       lambda state: state.ship_fragments.extend(entities.create_fragments(state.ship_pos, state.rng)), {}),
+    'swarm': (setup_swarm, fire_input, None, {'entity_store': False}),
+}
+if store.np is not None:
+    # The same swarm with the asteroids and bullets in the NumPy EntityStore, which needs the optional NumPy
+    SCENARIOS['swarm_store'] = (setup_swarm, fire_input, None, {'entity_store': True})
+
+# Run in a fresh interpreter, from the package's parent folder, to time a cold start up to the first menu frame
+COLD_START_SCRIPT = '''
+import json, time
+start = time.perf_counter()
+from alphastroid.game import init_display
+from alphastroid.simulation import GameState
+from alphastroid.render import draw_main_menu
+imported = time.perf_counter()
+screen = init_display()
+displayed = time.perf_counter()
+draw_main_menu(screen, GameState())
+import pygame
+pygame.display.flip()
+drawn = time.perf_counter()
+print(json.dumps({'import': (imported - start) * 1000, 'init_display': (displayed - imported) * 1000,
+                  'first_frame': (drawn - displayed) * 1000}))
+'''
+
+def run_scenario(name, frames, seed=0, screen=None, world_size=WORLD_SIZE):
+    '''
+    Runs one scenario and times every frame.
+
+    Arguments:
+        name (str): Key into SCENARIOS.
+        frames (int): Number of frames to run.
+        seed (int): Seed for the game's random number generator.
+        screen: Surface to draw on.
+        world_size (tuple): Width and height of the game's world.
+
+    Returns:
+        dict: FrameTimer report for the scenario.
+    '''
+    setup, inputs, per_frame, options = SCENARIOS[name]
+    state = simulation.GameState(seed, show_instructions=False, world_size=world_size, **options)
+    setup(state)
+    timer = FrameTimer()
+    accumulator = 0
+    for frame in range(frames):
+        if per_frame:
+            per_frame(state)
+        timer.begin_frame()
+        keys = inputs(frame) # Charged to the "input" phase
+        # Same fixed steps per frame as the window loop at FPS
+        accumulator += 1 / FPS
+        while accumulator >= SIM_DT:
+            simulation.step(state, keys, SIM_DT, timer)
+            accumulator -= SIM_DT
+        draw_game(screen, state, timer, alpha=accumulator / SIM_DT)
+        timer.end_frame()
+    return timer.report()
+
+def measure_cold_start(runs):
+    '''
+    Starts the game in fresh processes and times each one up to its first menu frame.
+
+    Arguments:
+        runs (int): Number of processes to start.
+
+    Returns:
+        dict: Report in the same shape as a scenario's, where 'frame' is the whole process launch and the
+        phases are importing the game, opening the display and drawing the first frame.
+    '''
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    totals = []
+    phases = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", COLD_START_SCRIPT], cwd=root, capture_output=True,
+                                text=True, check=True).stdout
+        totals.append((time.perf_counter() - start) * 1000)
+        for phase, elapsed in json.loads(output.splitlines()[-1]).items():
+            phases.setdefault(phase, []).append(elapsed)
+    return {
+        'frames': runs,
+        'frame': summarize_times(totals),
+        'phases': {phase: summarize_times(times) for phase, times in phases.items()}
+    }
+
+def compare(results, baseline, threshold):
+    '''
+    Finds phases whose mean time grew by more than the threshold compared with a baseline run.
+
+    Arguments:
+        results (dict): Current results by scenario.
+        baseline (dict): Earlier results by scenario.
+        threshold (float): Allowed relative growth, e.g. 0.1 for 10%.
+
+    Returns:
+        list: Human readable descriptions of every regression.
+    '''
+    regressions = []
+    for name, report in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        pairs = [('frame', report['frame'], old['frame'])]
+        pairs += [(phase, times, old['phases'][phase]) for phase, times in report['phases'].items() if phase in old['phases']]
+        for phase, new_times, old_times in pairs:
+            # Ignore phases too short to measure reliably
+            if old_times['mean'] > 0.01 and new_times['mean'] > old_times['mean'] * (1 + threshold):
+                regressions.append(f"{name}/{phase}: mean {old_times['mean']:.3f} ms -> {new_times['mean']:.3f} ms")
+    return regressions
+
+def main():
+    '''
+    Runs the selected scenarios and prints, saves and compares their results.
+    '''
+    parser = argparse.ArgumentParser(description="Alphastroid benchmarks")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append", help="scenario to run (default: all)")
+    parser.add_argument("--frames", type=int, default=1000, help="frames per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the game's random number generator")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown when comparing")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE, help="resolution to draw at relative to the playfield")
+    parser.add_argument("--world", metavar="WxH", type=size_argument, default=WORLD_SIZE, help="size of the game's world")
+    parser.add_argument("--cold-starts", type=int, default=5, help="fresh processes to time a cold start with (0 to skip)")
+    args = parser.parse_args()
+
+    from .game import init_display
+    viewport.set_scale(args.render_scale)
+    screen = init_display()
+    results = {name: run_scenario(name, args.frames, args.seed, screen, args.world) for name in (args.scenario or SCENARIOS)}
+    if args.cold_starts:
+        results['cold_start'] = measure_cold_start(args.cold_starts)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+'''
+Caches for loaded fonts, rotated glyph sprites and their collision masks.
+'''
+from collections import OrderedDict
+import pygame
+
+from .config import MAX_FONT_SIZES, SPRITE_ANGLE_STEP, SPRITE_CACHE_BYTES, MAX_COLLISION_MASKS
+from .assets import FONT_PATH
+
+# Font functions
+class FontCache:
+    '''
+    Keeps loaded fonts around so each (path, size) pair is only read from disk once.
+    
+    Sizes are truncated to whole numbers because pygame fonts only come in integer sizes. Asteroid sizes
+    are floats that scale with the wave, so the number of kept sizes is bounded and the least recently used
+    font is dropped when the bound is exceeded.
+    
+    Arguments:
+        max_fonts (int): Maximum number of fonts kept loaded at once.
+    '''
+    def __init__(self, max_fonts=MAX_FONT_SIZES):
+        self.max_fonts = max_fonts
+        self.fonts = OrderedDict() # Ordered from least to most recently used
+        self.hits = 0 # Requests answered from the cache
+        self.misses = 0 # Requests that had to load the font file
+    
+    def get(self, size, path=FONT_PATH):
+        '''
+        Returns the font for the given size, loading it on first use.
+        
+        Arguments:
+            size (int or float): Font size in points.
+            path (str): Path to the font file.
+        
+        Returns:
+            pygame.font.Font: The shared font object.
+        '''
+        key = (path, int(size))
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            self.fonts.move_to_end(key) # Mark as most recently used
+            return font
+        
+        self.misses += 1
+        font = pygame.font.Font(path, key[1])
+        self.fonts[key] = font
+        if len(self.fonts) > self.max_fonts:
+            self.fonts.popitem(last=False) # Evict least recently used size
+        return font
+    
+    def stats(self):
+        '''
+        Returns the cache counters.
+        
+        Returns:
+            dict: Number of loaded fonts, hits and misses.
+        '''
+        return {'fonts': len(self.fonts), 'hits': self.hits, 'misses': self.misses}
+
+font_cache = FontCache() # Shared by every draw function
+
+def get_font(size):
+    '''
+    Returns the Comfortaa font at the given size from the shared font cache.
+    
+    Arguments:
+        size (int or float): Font size in points.
+    
+    Returns:
+        pygame.font.Font: The cached font object.
+    '''
+    return font_cache.get(size)
+
+def render_glyph(letter, size, angle, color=(255, 255, 255)):
+    '''
+    Renders a letter and rotates it, the way asteroids and the ship are drawn.
+    
+    Arguments:
+        letter (str): Character to render.
+        size (int): Font size in points.
+        angle (float): Clockwise rotation in degrees.
+        color (tuple): RGB color of the letter.
+    
+    Returns:
+        pygame.Surface: The rotated letter with per-pixel alpha.
+    '''
+    text = get_font(size).render(letter, True, color)
+    return pygame.transform.rotate(text, -angle) # Negative for clockwise rotation
+
+class SpriteCache:
+    '''
+    Keeps rendered and rotated letter sprites so asteroids and the ship cost a single blit per frame.
+    
+    Sprites are keyed by letter, color, size bucket (whole font size) and rotation rounded to angle_step degrees.
+    The least recently used sprites are evicted once their pixel memory exceeds max_bytes.
+    
+    Arguments:
+        angle_step (int or float): Angle quantization in degrees.
+        max_bytes (int): Memory cap in bytes for all cached sprites.
+    '''
+    def __init__(self, angle_step=SPRITE_ANGLE_STEP, max_bytes=SPRITE_CACHE_BYTES):
+        self.sprites = OrderedDict() # Ordered from least to most recently used
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.angle_buckets = None
+        self.set_angle_step(angle_step)
+    
+    def set_angle_step(self, angle_step):
+        '''
+        Changes the angle quantization. Cached sprites are dropped since their keys no longer line up, unless
+        the step stays the same.
+        
+        Arguments:
+            angle_step (int or float): Angle quantization in degrees.
+        '''
+        angle_buckets = max(1, round(360 / angle_step))
+        if angle_buckets == self.angle_buckets:
+            return
+        self.angle_buckets = angle_buckets # Number of distinct rotations per glyph
+        self.angle_step = 360 / self.angle_buckets
+        self.clear()
+    
+    def clear(self):
+        '''
+        Drops every cached sprite.
+        '''
+        self.sprites.clear()
+        self.bytes_used = 0
+    
+    def get(self, letter, size, angle, color=(255, 255, 255)):
+        '''
+        Returns the sprite for a letter at the given size and rotation, rendering it on first use.
+        
+        Arguments:
+            letter (str): Character to render.
+            size (int or float): Font size in points.
+            angle (float): Clockwise rotation in degrees.
+            color (tuple): RGB color of the letter.
+        
+        Returns:
+            pygame.Surface: The rotated letter sprite.
+        '''
+        angle_bucket = round(angle / self.angle_step) % self.angle_buckets
+        key = (letter, int(size), angle_bucket, color)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key) # Mark as most recently used
+            return sprite
+        
+        self.misses += 1
+        sprite = render_glyph(letter, key[1], angle_bucket * self.angle_step, color)
+        self.sprites[key] = sprite
+        self.bytes_used += sprite.get_pitch() * sprite.get_height()
+        # Evict least recently used sprites until back under the memory cap, always keeping the new one
+        while self.bytes_used > self.max_bytes and len(self.sprites) > 1:
+            _, old_sprite = self.sprites.popitem(last=False)
+            self.bytes_used -= old_sprite.get_pitch() * old_sprite.get_height()
+            self.evictions += 1
+        return sprite
+    
+    def stats(self):
+        '''
+        Returns the cache counters.
+        
+        Returns:
+            dict: Number of sprites, bytes used, hits, misses and evictions.
+        '''
+        return {'sprites': len(self.sprites), 'bytes': self.bytes_used, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+sprite_cache = SpriteCache() # Shared by draw_ship and draw_asteroids
+
+class MaskCache:
+    '''
+    Keeps collision masks of rotated letters, built from the same glyphs SpriteCache draws.
+    
+    Masks are keyed by letter, size bucket (whole font size) and rotation rounded to angle_step degrees. The
+    angle step is fixed rather than following the sprite cache, so collisions do not change when the drawing
+    quality does. The least recently used masks are dropped once more than max_masks are kept.
+    
+    Arguments:
+        angle_step (int or float): Angle quantization in degrees.
+        max_masks (int): Maximum number of masks kept at once.
+    '''
+    def __init__(self, angle_step=SPRITE_ANGLE_STEP, max_masks=MAX_COLLISION_MASKS):
+        self.angle_buckets = max(1, round(360 / angle_step))
+        self.angle_step = 360 / self.angle_buckets
+        self.max_masks = max_masks
+        self.masks = OrderedDict() # Ordered from least to most recently used
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, letter, size, angle):
+        '''
+        Returns the mask of a letter at the given size and rotation, building it on first use.
+        
+        Arguments:
+            letter (str): Character of the asteroid.
+            size (int or float): Font size in points.
+            angle (float): Clockwise rotation in degrees.
+        
+        Returns:
+            pygame.mask.Mask: Set bits are the letter's opaque pixels.
+        '''
+        key = (letter, int(size), round(angle / self.angle_step) % self.angle_buckets)
+        mask = self.masks.get(key)
+        if mask is not None:
+            self.hits += 1
+            self.masks.move_to_end(key) # Mark as most recently used
+            return mask
+        
+        self.misses += 1
+        if not pygame.font.get_init():
+            pygame.font.init() # Headless games never opened a window, which normally starts the font module
+        mask = pygame.mask.from_surface(render_glyph(letter, key[1], key[2] * self.angle_step))
+        self.masks[key] = mask
+        if len(self.masks) > self.max_masks:
+            self.masks.popitem(last=False) # Evict least recently used mask
+        return mask
+    
+    def stats(self):
+        '''
+        Returns the cache counters.
+        
+        Returns:
+            dict: Number of masks, hits and misses.
+        '''
+        return {'masks': len(self.masks), 'hits': self.hits, 'misses': self.misses}
+
+mask_cache = MaskCache() # Shared by every game with precise collisions
@@ -0,0 +1,239 @@
+'''
+Capturing drawn frames to PNG files or a raw video stream.
+
+The game thread only copies each frame into a ring of buffers allocated up front in shared memory, a plain
+memory copy; turning the copies into files happens in a worker process. Converting the pixels and compressing
+PNGs both hold the GIL, so on a thread they would stall the game; in another process, at a lower priority, they
+only use the CPU time the game leaves. When the worker falls behind and every buffer is waiting for it, new
+frames are dropped instead of making the game wait.
+'''
+import os
+import sys
+import queue
+import multiprocessing
+from multiprocessing import shared_memory
+
+from .config import FPS, CAPTURE_FORMAT, CAPTURE_BUFFERS, CAPTURE_INTERVAL, CAPTURE_NICENESS
+from .simulation import step
+
+class FrameCapture:
+    '''
+    Copies frames into a ring of preallocated shared buffers and encodes them in a worker process.
+    
+    With the 'png' format every captured frame is saved as frame_NNNNNN.png in the path directory, numbered by
+    frame, so dropped frames show up as gaps. With 'raw' the frames are appended to the path file as one stream
+    of 8 bit RGB pixels, which for example ffmpeg reads with -f rawvideo -pixel_format rgb24 -video_size WxH.
+    The ring and the worker are set up on the first captured frame, whose size every later frame must have. The
+    worker is a spawned process, so a script creating a capture needs an if __name__ == "__main__" guard.
+    
+    Arguments:
+        path (str): Directory for PNG files, or file for the raw stream.
+        format (str): 'png' or 'raw'.
+        buffers (int): Frames that can wait for the worker at once.
+        interval (int): Capture every Nth frame offered.
+        wait (bool): Wait for a free buffer instead of dropping the frame, for runs without a player.
+    '''
+    FORMATS = ('png', 'raw')
+    
+    def __init__(self, path, format=CAPTURE_FORMAT, buffers=CAPTURE_BUFFERS, interval=CAPTURE_INTERVAL, wait=False):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown capture format {format!r}, expected one of {self.FORMATS}")
+        self.path = path
+        self.format = format
+        self.buffers = buffers
+        self.interval = interval
+        self.wait = wait
+        # Spawned rather than forked, so the worker does not inherit the window or the game's threads
+        self.context = multiprocessing.get_context('spawn')
+        self.memory = None # Shared memory holding every buffer of the ring, in the surface's own pixel layout
+        self.views = [] # Memoryview of every buffer, so copying into one allocates nothing
+        self.free = None # Indices of buffers the game thread may fill, handed back by the worker
+        self.filled = None # (buffer index, frame number) waiting for the worker, None to stop it
+        self.layout = None # (size, pitch, bytes per pixel, byte offset of red, green and blue) of the frames
+        self.worker = None
+        self.encoded_count = None # Frames the worker has written, shared with it
+        self.frames = 0 # Frames offered to capture()
+        self.captured = 0
+        self.dropped = 0 # Frames skipped because no buffer was free or their size changed
+    
+    @property
+    def encoded(self):
+        '''
+        Number of frames the worker has written so far.
+        '''
+        return self.encoded_count.value if self.encoded_count is not None else 0
+    
+    def capture(self, surface):
+        '''
+        Copies a frame for the worker to encode, unless it falls between captured frames or no buffer is free.
+        
+        Arguments:
+            surface (pygame.Surface): The drawn frame, with 24 or 32 bits per pixel.
+        
+        Returns:
+            bool: True if the frame was captured.
+        '''
+        frame = self.frames
+        self.frames += 1
+        if frame % self.interval:
+            return False
+        if self.layout is None:
+            self.start(surface)
+        if (surface.get_size(), surface.get_pitch()) != self.layout[:2]:
+            self.dropped += 1 # The ring is sized for the first frame
+            return False
+        try:
+            index = self.free.get(self.wait)
+        except queue.Empty:
+            self.dropped += 1 # The worker is behind; dropping keeps the game running at full speed
+            return False
+        self.views[index][:] = surface.get_view('0')
+        self.filled.put((index, frame))
+        self.captured += 1
+        return True
+    
+    def start(self, surface):
+        '''
+        Allocates the ring for frames like the given one and starts the worker.
+        
+        Arguments:
+            surface (pygame.Surface): First frame to capture.
+        '''
+        bytesize = surface.get_bytesize()
+        if bytesize not in (3, 4):
+            raise ValueError(f"Frames must have 24 or 32 bits per pixel to be captured, not {surface.get_bitsize()}")
+        # Byte of each color within a pixel, from the bit shifts of the color masks
+        offsets = tuple(shift // 8 if sys.byteorder == 'little' else bytesize - 1 - shift // 8
+                        for shift in surface.get_shifts()[:3])
+        self.layout = (surface.get_size(), surface.get_pitch(), bytesize, offsets)
+        frame_bytes = surface.get_pitch() * surface.get_height()
+        self.memory = shared_memory.SharedMemory(create=True, size=frame_bytes * self.buffers)
+        self.views = [self.memory.buf[index * frame_bytes:(index + 1) * frame_bytes] for index in range(self.buffers)]
+        self.free = self.context.Queue()
+        self.filled = self.context.Queue()
+        for index in range(self.buffers):
+            self.free.put(index)
+        if self.format == 'png':
+            os.makedirs(self.path, exist_ok=True)
+        self.encoded_count = self.context.Value('i', 0, lock=False) # Only the worker writes it
+        self.worker = self.context.Process(target=encode_frames, name="alphastroid-capture", daemon=True,
+                                           args=(self.memory.name, self.layout, self.buffers, self.format, self.path,
+                                                 self.filled, self.free, self.encoded_count))
+        self.worker.start()
+    
+    def close(self):
+        '''
+        Waits for the worker to encode every captured frame, then stops it and frees the ring.
+        '''
+        if self.worker is not None:
+            self.filled.put(None)
+            self.worker.join()
+            self.worker = None
+        if self.memory is not None:
+            for view in self.views:
+                view.release() # Shared memory cannot be closed while views of it exist
+            self.views = []
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+    
+    def stats(self):
+        '''
+        Returns what happened to the frames offered so far.
+        
+        Returns:
+            dict: Number of 'frames' offered, 'captured', 'dropped' and 'encoded' frames, and the frame 'size'.
+        '''
+        return {'frames': self.frames, 'captured': self.captured, 'dropped': self.dropped, 'encoded': self.encoded,
+                'size': self.layout[0] if self.layout else None}
+
+def encode_frames(memory_name, layout, buffers, format, path, filled, free, encoded):
+    '''
+    Worker process: converts every filled buffer to RGB, hands the buffer back and writes the frame out.
+    
+    Arguments:
+        memory_name (str): Name of the shared memory holding the ring.
+        layout (tuple): (size, pitch, bytes per pixel, byte offset of red, green and blue) of the frames.
+        buffers (int): Number of buffers in the ring.
+        format (str): 'png' or 'raw'.
+        path (str): Directory for PNG files, or file for the raw stream.
+        filled (multiprocessing.Queue): (buffer index, frame number) to encode, None to stop.
+        free (multiprocessing.Queue): Receives the index of every buffer that may be filled again.
+        encoded (multiprocessing.Value): Counts the frames written.
+    '''
+    if hasattr(os, 'nice'):
+        os.nice(CAPTURE_NICENESS) # On a busy machine the game gets the CPU first and frames are dropped instead
+    import pygame # Only the image module is used, which needs no display
+    (width, height), pitch, bytesize, offsets = layout
+    row_bytes = width * bytesize
+    frame_bytes = pitch * height
+    rgb = bytearray(width * height * 3) # Reused for every frame
+    memory = shared_memory.SharedMemory(memory_name)
+    file = open(path, 'wb') if format == 'raw' else None
+    try:
+        while True:
+            item = filled.get()
+            if item is None:
+                break
+            index, frame = item
+            pixels = memory.buf[index * frame_bytes:(index + 1) * frame_bytes]
+            if pitch != row_bytes:
+                pixels = b"".join(pixels[row * pitch:row * pitch + row_bytes] for row in range(height))
+            for channel, offset in enumerate(offsets):
+                rgb[channel::3] = pixels[offset::bytesize]
+            del pixels # Drop the view before the buffer can be reused or the memory closed
+            free.put(index) # The copy is taken, so the game thread may fill the buffer again
+            if format == 'png':
+                pygame.image.save(pygame.image.frombuffer(rgb, (width, height), 'RGB'),
+                                  os.path.join(path, f"frame_{frame:06d}.png"))
+            else:
+                file.write(rgb)
+            encoded.value += 1
+    finally:
+        if file is not None:
+            file.close()
+        memory.close()
+
+def report_capture(capture):
+    '''
+    Prints how many frames were captured and dropped, and where they went.
+    
+    Arguments:
+        capture (FrameCapture): A closed capture.
+    '''
+    stats = capture.stats()
+    print(f"Captured {stats['encoded']} of {stats['frames']} frames to {capture.path}, dropped {stats['dropped']}")
+    if capture.format == 'raw' and stats['size']:
+        width, height = stats['size']
+        print(f"Raw stream: -f rawvideo -pixel_format rgb24 -video_size {width}x{height}")
+
+def capture_headless(state, inputs, capture, fps=FPS):
+    '''
+    Steps a game without a window and draws it into a capture at a fixed frame rate of game time, as fast as
+    possible. Drawing goes through SDL's dummy video driver, so no display is needed.
+    
+    Arguments:
+        state (GameState): Game to run.
+        inputs (iterable): (keys, dt) of every step, e.g. Recording.inputs().
+        capture (FrameCapture): Capture to draw into, normally one that waits instead of dropping frames.
+        fps (int): Frames drawn per second of game time.
+    
+    Returns:
+        GameState: The game after the last step.
+    '''
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from .game import init_display
+    from .render import draw_game
+    screen = init_display()
+    frame_time = 1 / fps
+    accumulator = frame_time # Draw the first step too
+    for keys, dt in inputs:
+        if state.game_over:
+            break
+        step(state, keys, dt)
+        accumulator += dt
+        if accumulator >= frame_time:
+            accumulator -= frame_time
+            draw_game(screen, state)
+            capture.capture(screen)
+    return state
@@ -0,0 +1,135 @@
+'''
+Command line entry point.
+
+Headless runs only import the simulation, so pygame is never loaded and no window is opened.
+'''
+import sys
+import time
+import argparse
+
+from .config import (WIDTH, HEIGHT, FPS, DIRTY_RECTS, PRECISE_COLLISIONS, ADAPTIVE_QUALITY, RENDER_SCALE, WINDOW_SIZE,
+                     FULLSCREEN, SMOOTH_SCALING, WORLD_SIZE, LOW_GARBAGE, MEMORY_STATS, CAPTURE_FORMAT, CAPTURE_INTERVAL,
+                     SIM_DT, QUICKSAVE_PATH, ENTITY_STORE)
+
+def size_argument(text):
+    '''
+    Parses a window or world size given as WIDTHxHEIGHT.
+    
+    Arguments:
+        text (str): Size such as "1200x800".
+    
+    Returns:
+        tuple: (width, height) in pixels.
+    '''
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive, got {text!r}")
+    return width, height
+
+def cli(argv=None):
+    '''
+    Parses the command line and runs the game in a window or headless.
+    
+    Arguments:
+        argv (list or None): Arguments to parse, defaults to sys.argv.
+    '''
+    parser = argparse.ArgumentParser(prog="alphastroid", description="Alphastroid")
+    parser.add_argument("--headless", action="store_true", help="simulate without a window as fast as possible")
+    parser.add_argument("--frames", type=int, default=10000, help="number of simulation steps to run when headless")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the game's random number generator when headless")
+    parser.add_argument("--dirty-rects", action="store_true", default=DIRTY_RECTS, help="redraw only the changed parts of the screen")
+    parser.add_argument("--fps", type=int, default=FPS, help="frames drawn per second in a window, 0 for uncapped")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE,
+                        help="resolution to draw at relative to the 600x400 playfield, e.g. 0.5 or 2")
+    parser.add_argument("--window", metavar="WxH", type=size_argument, default=WINDOW_SIZE, help="window size, by default the render resolution")
+    parser.add_argument("--fullscreen", action="store_true", default=FULLSCREEN, help="fill the screen")
+    parser.add_argument("--smooth-scaling", action="store_true", default=SMOOTH_SCALING,
+                        help="smooth the drawn frame when scaling it to the window")
+    parser.add_argument("--world", metavar="WxH", type=size_argument, default=WORLD_SIZE,
+                        help="size of the wrapping world, e.g. 6000x4000 for a world of 10x10 playfields the view scrolls through")
+    parser.add_argument("--fixed-quality", action="store_false", dest="adaptive_quality", default=ADAPTIVE_QUALITY,
+                        help="always draw at full quality instead of lowering it when frames run over budget")
+    parser.add_argument("--precise-collisions", action="store_true", default=PRECISE_COLLISIONS,
+                        help="check hits against the letters' pixels instead of their bounding circles")
+    parser.add_argument("--entity-store", action="store_true", default=ENTITY_STORE,
+                        help="keep asteroids and bullets in NumPy arrays, for worlds with thousands of them")
+    parser.add_argument("--low-garbage", action="store_true", default=LOW_GARBAGE,
+                        help="only collect garbage at safe points such as wave transitions, with startup objects frozen")
+    parser.add_argument("--memory-stats", action="store_true", default=MEMORY_STATS,
+                        help="measure garbage collections and allocations per frame and phase (slows the game down)")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="capture the drawn frames to a directory of PNG files or, with --capture-format raw, a file")
+    parser.add_argument("--capture-format", choices=("png", "raw"), default=CAPTURE_FORMAT,
+                        help="numbered PNG files or one raw RGB video stream")
+    parser.add_argument("--capture-interval", type=int, default=CAPTURE_INTERVAL, help="capture every Nth frame")
+    parser.add_argument("--quicksave", metavar="FILE", default=QUICKSAVE_PATH,
+                        help="file F5 saves the game in progress to and F9 loads it from")
+    parser.add_argument("--record", metavar="FILE", help="save a recording of the game (of each new game in a window)")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recording and check its final score, wave and lives")
+    args = parser.parse_args(argv)
+    if not 0 <= args.seed < 2 ** 64:
+        parser.error("--seed must be between 0 and 2**64 - 1, the range recordings and snapshots store")
+    if args.render_scale <= 0:
+        parser.error("--render-scale must be positive")
+    if args.world[0] < WIDTH or args.world[1] < HEIGHT:
+        parser.error(f"--world must be at least the {WIDTH}x{HEIGHT} playfield")
+    if args.capture_interval <= 0:
+        parser.error("--capture-interval must be positive")
+    if args.headless and args.capture and args.record:
+        parser.error("--record cannot be combined with --capture when headless")
+    replay = None
+    if args.replay:
+        from .replay import Recording
+        replay = Recording.load(args.replay)
+    
+    if args.headless:
+        start = time.perf_counter()
+        if args.capture:
+            # Drawing needs pygame, but only through the dummy video driver, so there is still no window
+            from .capture import FrameCapture, capture_headless, report_capture
+            from .simulation import GameState, demo_input
+            from .viewport import viewport
+            viewport.set_scale(args.render_scale) # Frames are captured at the render resolution
+            capture = FrameCapture(args.capture, args.capture_format, interval=args.capture_interval, wait=True)
+            if replay is not None:
+                state, inputs = replay.new_game(args.entity_store), replay.inputs()
+            else:
+                state = GameState(args.seed, False, args.precise_collisions, args.world, args.entity_store)
+                inputs = ((demo_input(frame), SIM_DT) for frame in range(args.frames))
+            final_state = capture_headless(state, inputs, capture, args.fps or FPS)
+            capture.close()
+            report_capture(capture)
+            matched = True
+            if replay is not None:
+                from .replay import report_replay
+                matched = report_replay(replay, final_state)
+        elif replay is not None:
+            from .replay import replay_headless, report_replay
+            final_state = replay_headless(replay, args.entity_store)
+            matched = report_replay(replay, final_state)
+        else:
+            from .simulation import run_headless
+            from .replay import Recording
+            recording = Recording(args.seed, False, args.precise_collisions, args.world) if args.record else None
+            final_state = run_headless(args.frames, args.seed, recording=recording,
+                                       precise_collisions=args.precise_collisions, world_size=args.world,
+                                       entity_store=args.entity_store)
+            if recording is not None:
+                recording.save(args.record)
+            matched = True
+        elapsed = time.perf_counter() - start
+        print(f"frames={final_state.frame} score={final_state.score} wave={final_state.current_wave} "
+              f"lives={final_state.lives} fps={final_state.frame / elapsed:.0f}")
+        if not matched:
+            sys.exit(1)
+    else:
+        from .game import main
+        main(dirty_rects=args.dirty_rects, record=args.record, replay=replay,
+             precise_collisions=args.precise_collisions, fps=args.fps, adaptive_quality=args.adaptive_quality,
+             render_scale=args.render_scale, window_size=args.window, fullscreen=args.fullscreen,
+             smooth_scaling=args.smooth_scaling, world_size=args.world, low_garbage=args.low_garbage,
+             memory_stats=args.memory_stats, capture=args.capture, capture_format=args.capture_format,
+             capture_interval=args.capture_interval, quicksave=args.quicksave, entity_store=args.entity_store)
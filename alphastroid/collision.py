@@ -0,0 +1,244 @@
+'''
+Broad-phase collision detection between the ship, bullets and asteroids.
+'''
+import math
+
+from .config import WIDTH, HEIGHT, COLLISION_CELL_SIZE
+from .entities import split_asteroid
+
+# Collision functions
+EMPTY_CELL = () # Returned for cells nothing was inserted into
+
+class SpatialHash:
+    '''
+    Uniform grid over the wrapping world used as a broad phase for collision checks.
+    
+    Cell coordinates wrap the same way positions do with the world's width and height, so an object near one edge
+    lands in the cells on the opposite edge too, and points outside the screen (like bullets that have flown
+    off it) still map onto the grid. Each cell lists the indices inserted into it in insertion order.
+    
+    Arguments:
+        width (int): Width of the world.
+        height (int): Height of the world.
+        cell_size (int): Approximate size of a cell; it is adjusted so cells tile the world exactly.
+    '''
+    def __init__(self, width, height, cell_size=COLLISION_CELL_SIZE):
+        self.width = width
+        self.height = height
+        self.cols = max(1, round(width / cell_size))
+        self.rows = max(1, round(height / cell_size))
+        self.cell_width = width / self.cols
+        self.cell_height = height / self.rows
+        self.cells = {} # Maps (column, row) to a list of indices
+        self.filled = [] # Cell lists that are not empty, so clearing a large, sparse grid only visits those
+    
+    def clear(self):
+        '''
+        Removes everything from the grid. The cell lists are emptied rather than dropped so they are reused.
+        '''
+        for cell in self.filled:
+            cell.clear()
+        self.filled.clear()
+    
+    def insert(self, index, x, y, radius):
+        '''
+        Adds an object to every cell its bounding box overlaps.
+        
+        Arguments:
+            index (int): Identifier stored in the cells, normally the object's list index.
+            x (float): Center x-position.
+            y (float): Center y-position.
+            radius (float): Radius of the object.
+        '''
+        first_col = math.floor((x - radius) / self.cell_width)
+        first_row = math.floor((y - radius) / self.cell_height)
+        # Never cover more cells than the grid has, otherwise wrapping would list the object twice in a cell
+        col_count = min(math.floor((x + radius) / self.cell_width) - first_col + 1, self.cols)
+        row_count = min(math.floor((y + radius) / self.cell_height) - first_row + 1, self.rows)
+        for col in range(first_col, first_col + col_count):
+            for row in range(first_row, first_row + row_count):
+                cell = self.cells.setdefault((col % self.cols, row % self.rows), [])
+                if not cell:
+                    self.filled.append(cell)
+                cell.append(index)
+    
+    def query(self, x, y):
+        '''
+        Returns the indices of objects whose bounding boxes may contain the given point.
+        
+        Arguments:
+            x (float): Point x-position.
+            y (float): Point y-position.
+        
+        Returns:
+            list: Candidate indices in insertion order.
+        '''
+        return self.cells.get((math.floor(x / self.cell_width) % self.cols, math.floor(y / self.cell_height) % self.rows), EMPTY_CELL)
+
+collision_grid = SpatialHash(WIDTH, HEIGHT) # Rebuilt for every collision pass of games the size of the playfield
+
+def wrapped_offset(delta, period):
+    '''
+    Reduces the distance between two positions along a wrapping axis to the shortest way around.
+    
+    Arguments:
+        delta (float): Difference of the two positions.
+        period (float): Length of the axis.
+    
+    Returns:
+        float: The equivalent difference between -period / 2 and period / 2.
+    '''
+    return (delta + period / 2) % period - period / 2
+
+def hits_letter(masks, asteroid, x, y, world=None):
+    '''
+    Checks whether a point lands on one of the opaque pixels of an asteroid's letter as it is drawn.
+    
+    Arguments:
+        masks (MaskCache): Cache to take the letter's mask from.
+        asteroid (Asteroid): Asteroid to check.
+        x (float): Point x-position.
+        y (float): Point y-position.
+        world (tuple or None): (width, height) of a world the positions wrap around in, so the point is taken on
+            the same side of its edges as the asteroid; None to use the positions as they are.
+    
+    Returns:
+        bool: True if the point is on the letter.
+    '''
+    if world is not None:
+        x = asteroid.x + wrapped_offset(x - asteroid.x, world[0])
+        y = asteroid.y + wrapped_offset(y - asteroid.y, world[1])
+    mask = masks.get(asteroid.letter, asteroid.size, asteroid.angle)
+    width, height = mask.get_size()
+    # Same placement as draw_asteroids, which centers the sprite on the integer position
+    mask_x = int(x) - (int(asteroid.x) - width // 2)
+    mask_y = int(y) - (int(asteroid.y) - height // 2)
+    return 0 <= mask_x < width and 0 <= mask_y < height and mask.get_at((mask_x, mask_y)) == 1
+
+def fill_grid(grid, asteroids, focus=None):
+    '''
+    Rebuilds a grid with the asteroids, or only with those that overlap a square around a point.
+    
+    Leaving out asteroids is only worth it in a world much larger than the playfield, where most of them are
+    nowhere near the ship. A distance check is much cheaper than inserting an asteroid into the grid's cells, and
+    an asteroid that does not overlap the square cannot be hit by anything inside it.
+    
+    Arguments:
+        grid (SpatialHash): Grid to rebuild.
+        asteroids (Pool): Asteroids to insert, by index.
+        focus (tuple or None): (x, y, reach) of a square reaching this far from a point across the grid's wrapping
+            edges, or None for every asteroid.
+    '''
+    grid.clear()
+    if focus is None:
+        for index, asteroid in enumerate(asteroids):
+            grid.insert(index, asteroid.x, asteroid.y, asteroid.size / 2)
+        return
+    x, y, reach = focus
+    width, height = grid.width, grid.height
+    for index, asteroid in enumerate(asteroids):
+        radius = asteroid.size / 2
+        distance_x = abs(asteroid.x - x)
+        distance_y = abs(asteroid.y - y)
+        if (min(distance_x, width - distance_x) < reach + radius
+                and min(distance_y, height - distance_y) < reach + radius):
+            grid.insert(index, asteroid.x, asteroid.y, radius)
+
+def find_ship_collision(asteroids, position, masks=None, grid=collision_grid, focus=False, world=None):
+    '''
+    Finds the first asteroid (in pool order) that overlaps the ship.
+    
+    Arguments:
+        asteroids (Pool): Asteroids to check.
+        position: Ship x, y coordinates.
+        masks (MaskCache or None): When given, a hit inside an asteroid's circle must also land on its letter.
+        grid (SpatialHash): Grid covering the game's world, rebuilt for the check.
+        focus (bool): Only put the asteroids near the ship into the grid (see fill_grid()).
+        world (tuple or None): (width, height) of a world the view scrolls across, so the ship and an asteroid on
+            opposite sides of its edges, drawn next to each other, can collide; None to compare positions as they are.
+    
+    Returns:
+        Asteroid or None: The asteroid that hit the ship, or None.
+    '''
+    fill_grid(grid, asteroids, (position[0], position[1], 0) if focus else None)
+    
+    for index in grid.query(position[0], position[1]):
+        asteroid = asteroids[index]
+        dx = position[0] - asteroid.x
+        dy = position[1] - asteroid.y
+        if world is not None:
+            dx = wrapped_offset(dx, world[0])
+            dy = wrapped_offset(dy, world[1])
+        radius = asteroid.size / 2
+        if dx * dx + dy * dy < radius * radius: # Compare squared distances to skip the square root
+            if masks is None or hits_letter(masks, asteroid, position[0], position[1], world):
+                return asteroid
+    return None
+
+def collide_bullets_with_asteroids(bullets, asteroids, rng, masks=None, grid=collision_grid, focus=None, world=None):
+    '''
+    Destroys every bullet that hits an asteroid along with the asteroid it hit, splitting asteroids that are large enough.
+    
+    Bullets are checked in order and each one destroys the first asteroid in pool order it overlaps. Asteroids split
+    off earlier in the same pass can be hit by later bullets. Destroyed bullets and asteroids stay in their pools
+    until the end of the pass, so indices stay valid, and are then released back to front.
+    
+    Arguments:
+        bullets (Pool): Bullets to check, updated in place.
+        asteroids (Pool): Asteroids to check, updated in place.
+        rng (random.Random): Random number generator used to split asteroids.
+        masks (MaskCache or None): When given, a hit inside an asteroid's circle must also land on its letter.
+        grid (SpatialHash): Grid covering the game's world, rebuilt for the pass.
+        focus (list or None): Position the bullets were fired from (the ship) in a world the bullets wrap around
+            in. Only the asteroids near the bullets are then put into the grid (see fill_grid()).
+        world (tuple or None): (width, height) of a world the view scrolls across, so bullets hit asteroids across
+            its edges; None to compare positions as they are.
+    
+    Returns:
+        int: Number of asteroids destroyed.
+    '''
+    if not bullets or not asteroids:
+        return 0
+    
+    if focus is not None:
+        # Square around the ship that holds every bullet
+        reach = 0
+        for bullet in bullets:
+            distance_x = abs(bullet.x - focus[0])
+            distance_y = abs(bullet.y - focus[1])
+            reach = max(reach, min(distance_x, grid.width - distance_x), min(distance_y, grid.height - distance_y))
+        focus = (focus[0], focus[1], reach)
+    fill_grid(grid, asteroids, focus)
+    
+    destroyed = set() # Indices of destroyed asteroids
+    spent = set() # Indices of bullets that hit something
+    for bullet_index, bullet in enumerate(bullets):
+        for index in grid.query(bullet.x, bullet.y):
+            if index in destroyed:
+                continue
+            asteroid = asteroids[index]
+            dx = bullet.x - asteroid.x
+            dy = bullet.y - asteroid.y
+            if world is not None:
+                dx = wrapped_offset(dx, world[0])
+                dy = wrapped_offset(dy, world[1])
+            radius = asteroid.size / 2
+            
+            # If bullet hits the asteroid (distance less than radius), checking its pixels only then
+            if dx * dx + dy * dy < radius * radius and (masks is None or hits_letter(masks, asteroid, bullet.x, bullet.y, world)):
+                spent.add(bullet_index)
+                destroyed.add(index)
+                # Create smaller asteroids if this one can split, and make them hittable by the remaining bullets
+                first_child = len(asteroids)
+                for child_index in range(first_child, first_child + split_asteroid(asteroid, rng, asteroids)):
+                    child = asteroids[child_index]
+                    grid.insert(child_index, child.x, child.y, child.size / 2)
+                break # Bullet can only hit one asteroid
+    
+    # Remove everything that was hit, highest index first so the entities swapped into freed slots are never hit ones
+    if spent:
+        for index in sorted(spent, reverse=True):
+            bullets.release(index)
+        for index in sorted(destroyed, reverse=True):
+            asteroids.release(index)
+    return len(destroyed)
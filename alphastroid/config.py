@@ -0,0 +1,93 @@
+'''
+Constants shared by the simulation, the renderer and the window loop.
+'''
+
+# Display settings
+WIDTH, HEIGHT = 600, 400 # Playfield the simulation runs in; drawn at RENDER_SCALE times this size
+FPS = 60 # Frames drawn per second in a window, 0 for uncapped (also --fps)
+RENDER_SCALE = 1.0 # Resolution the game is drawn at, relative to the playfield (also --render-scale)
+WINDOW_SIZE = None # Window width and height, None for the render resolution (also --window)
+FULLSCREEN = False # Fill the screen, at the desktop resolution unless WINDOW_SIZE is set (also --fullscreen)
+SMOOTH_SCALING = False # Scale the drawn frame to the window with smoothscale() (also --smooth-scaling)
+
+# Simulation settings
+SIM_RATE = 120 # Simulation steps per second, fixed so the game plays the same at any frame rate
+SIM_DT = 1 / SIM_RATE # Time step of every simulation step in seconds
+MAX_FRAME_TIME = 0.25 # Longest frame the simulation catches up on; longer hitches slow the game down instead
+
+# World settings
+WORLD_SIZE = (WIDTH, HEIGHT) # Size of the wrapping world; in a larger one the view follows the ship (also --world)
+CULL_MARGIN = 64 # Entities this many pixels outside the view are still drawn, anything farther out is skipped
+FAR_UPDATE_INTERVAL = 4 # In a larger world, asteroids more than a playfield away from the ship move every Nth step
+
+# Constants for game mechanics
+SHIP_TURN_SPEED = 180 # Degrees per second
+SHIP_ACCELERATION = 250
+FRICTION = 0.99 ** 60 # Fraction of the ship's velocity kept after one second (0.99 per frame at 60 FPS)
+MAX_SPEED = 300
+NUM_ASTEROIDS = 2
+SPAWN_SAFE_DISTANCE = 100 # Asteroids never spawn inside the square reaching this far from the ship
+SPAWN_ATTEMPTS = 30 # Random positions tried per asteroid before spawn placement falls back
+SPAWN_SPACING = 0.6 # Minimum distance between a wave's spawn points, relative to the average spacing
+BULLET_LIFESPAN = 2
+BULLET_COOLDOWN = 0.2
+NUM_STARS = 75
+STAR_LAYER_SPEEDS = (0.25, 0.55, 0.85) # Parallax speed factor of each star depth layer, far to near
+STAR_TWINKLE_GROUPS = 4 # Stars in a layer twinkle in this many groups
+
+# Font settings
+MAX_FONT_SIZES = 64 # Upper bound on how many font sizes are kept loaded at once
+
+# Sprite cache settings
+SPRITE_ANGLE_STEP = 3 # Rotations are rounded to multiples of this many degrees
+SPRITE_CACHE_BYTES = 32 * 1024 * 1024 # Memory cap for cached glyph sprites
+
+# Debug overlay settings
+DEBUG_HISTORY = 120 # Number of recent frames kept for the overlay's sparkline and phase averages
+FRAME_BUDGET_MS = 1000 / FPS # Time available per frame at the target frame rate
+
+# Rendering settings
+DIRTY_RECTS = False # Redraw and present only the changed parts of the screen (also --dirty-rects)
+
+# Adaptive quality settings
+ADAPTIVE_QUALITY = True # Lower the drawing quality while frames go over budget (off with --fixed-quality)
+QUALITY_LEVELS = ( # Best first: (star density, sprite angle step in degrees, fragment detail, HUD update interval in frames)
+    (1.0, SPRITE_ANGLE_STEP, 2, 1),
+    (0.75, SPRITE_ANGLE_STEP, 2, 2),
+    (0.5, 6, 1, 2),
+    (0.5, 10, 1, 4),
+    (0.25, 15, 0, 8),
+)
+QUALITY_WINDOW = 30 # Frames averaged before the quality level is judged
+QUALITY_HEADROOM = 0.6 # Quality is raised when frames average under this fraction of the budget
+QUALITY_RAISE_DELAY = 180 # Frames a level is kept at least before quality is raised again
+
+# Wave preparation settings
+WAVE_WARM_BUDGET_MS = 1.0 # Time per frame spent pre-rendering the next wave's letters
+
+# Memory settings
+LOW_GARBAGE = False # Freeze startup objects and only collect garbage at safe points such as wave transitions (also --low-garbage)
+MEMORY_STATS = False # Time garbage collections and trace allocations per frame and phase, slowing the game (also --memory-stats)
+GC_PENDING_LIMIT = 10000 # In low-garbage mode, young objects that may pile up before they are collected anyway
+
+# Capture settings
+CAPTURE_FORMAT = 'png' # 'png' for numbered PNG files in a directory, 'raw' for one RGB video stream (also --capture-format)
+CAPTURE_BUFFERS = 8 # Captured frames that can wait for the encoder; further frames are dropped rather than wait
+CAPTURE_INTERVAL = 1 # Capture every Nth drawn frame (also --capture-interval)
+CAPTURE_NICENESS = 10 # How much lower the encoding process's priority is than the game's
+
+# Snapshot settings
+QUICKSAVE_PATH = 'quicksave.snap' # File F5 saves the game in progress to and F9 loads it from (also --quicksave)
+REWIND_INTERVAL = 30 # Steps between the snapshots F8 rewinds to
+REWIND_HISTORY = 40 # Rewind snapshots kept, ten seconds at the fixed time step
+REWIND_STEPS = 120 # Steps F8 goes back at least, one second at the fixed time step
+
+# Entity pool settings
+ASTEROID_POOL_SIZE = 64 # Asteroids allocated up front; the pool grows if a wave ever needs more
+BULLET_POOL_SIZE = 16 # Bullets allocated up front, comfortably above the most that can be alive at once
+ENTITY_STORE = False # Keep asteroids and bullets in NumPy arrays and move and collide them vectorized, for thousands of them (also --entity-store)
+
+# Collision settings
+COLLISION_CELL_SIZE = 64 # Approximate width and height of a spatial hash cell in pixels
+PRECISE_COLLISIONS = False # Check hits against the letter's pixels instead of its bounding circle (also --precise-collisions)
+MAX_COLLISION_MASKS = 4096 # Upper bound on how many letter collision masks are kept at once
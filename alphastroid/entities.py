@@ -0,0 +1,521 @@
+'''
+Creation and movement of fragments, asteroids, bullets and stars. None of this needs a display.
+'''
+import math
+import random
+import string
+from itertools import islice
+
+from .config import (WIDTH, HEIGHT, NUM_ASTEROIDS, BULLET_LIFESPAN, NUM_STARS, STAR_LAYER_SPEEDS, SPAWN_SAFE_DISTANCE,
+                     SPAWN_ATTEMPTS, SPAWN_SPACING)
+
+# Fragment functions
+def create_fragments(position, rng):
+    '''
+    Creates ship debris fragments upon destruction.
+    
+    Arguments:
+        position: Position of the ship at time of destruction.
+        rng (random.Random): Random number generator of the game.
+    
+    Returns:
+        A list of dictionaries representing fragments.
+    '''
+    x = position[0]
+    y = position[1]
+    fragments = [] # Create a list for fragments
+    fragment_shapes = [
+        {'offset_start': [0, 0], 'offset_end': [-8, 20]}, # Left fragment (angled left)
+        {'offset_start': [0, 0], 'offset_end': [8, 20]}, # Right fragment (angled right)
+        {'offset_start': [-5, 10], 'offset_end': [5, 10]}, # Center fragment (horizontal)
+    ]
+    
+    for shape in fragment_shapes:
+        # Randomly determine direction (angle in degrees) and speed for each fragment
+        direction = rng.uniform(0, 360)
+        speed = rng.uniform(20, 70)
+        # Convert direction and speed into velocity components (vx, vy)
+        vx = math.cos(math.radians(direction)) * speed
+        vy = math.sin(math.radians(direction)) * speed
+        # Append a dictionary with fragment data: start/end points, velocity, and transparency
+        fragments.append({
+            'start' : [x + shape['offset_start'][0], y + shape['offset_start'][1]],
+            'end' : [x + shape['offset_end'][0], y + shape['offset_end'][1]],
+            'vx': vx, 'vy': vy,
+            'transparency': 255
+        })
+    return fragments
+
+def update_fragments(fragments, dt):
+    '''
+    Moves the ship fragments and fades them out, removing the ones that are fully transparent.
+    
+    Arguments:
+        fragments (list): Fragment dictionaries to update in place.
+        dt: Delta time since last frame.
+    '''
+    fade_speed = 100 # Speed at which fragments fade out (alpha decrease per second)
+    
+    for fragment in fragments:
+        # Update position of both start and end points of the fragment based on velocity and delta time
+        fragment['start'][0] += fragment['vx'] * dt
+        fragment['start'][1] += fragment['vy'] * dt
+        fragment['end'][0] += fragment['vx'] * dt
+        fragment['end'][1] += fragment['vy'] * dt
+        
+        # Reduce transparency to create fading effect
+        fragment['transparency'] -= fade_speed * dt
+    
+    # Remove fragments once they are fully transparent, in one pass instead of a remove() per fragment
+    if any(fragment['transparency'] <= 0 for fragment in fragments):
+        fragments[:] = [fragment for fragment in fragments if fragment['transparency'] > 0]
+
+# Entity pools
+class Asteroid:
+    '''
+    A letter shaped asteroid. Instances live in a Pool and are reused instead of being created and thrown away.
+    
+    prev_x, prev_y and prev_angle hold the values before the last simulation step, for render interpolation. In a
+    world larger than the playfield, far asteroids only move every few steps: far says whether the asteroid was
+    more than a playfield from the ship when it last moved (and so out of view), lag is the time it has not
+    moved for since.
+    '''
+    __slots__ = ('x', 'y', 'vx', 'vy', 'letter', 'size', 'angle', 'spin', 'prev_x', 'prev_y', 'prev_angle', 'far',
+                 'lag')
+    
+    def __init__(self, x=0, y=0, vx=0, vy=0, letter='B', size=0, angle=0, spin=0):
+        self.set(x, y, vx, vy, letter, size, angle, spin)
+    
+    def set(self, x, y, vx, vy, letter, size, angle, spin):
+        '''
+        Overwrites every field, e.g. when the asteroid is taken from a pool.
+        
+        Arguments:
+            x, y (float): Position.
+            vx, vy (float): Velocity in pixels per second.
+            letter (str): Letter drawn for the asteroid.
+            size (float): Font size of the letter, which is also the asteroid's diameter.
+            angle (float): Rotation angle in degrees.
+            spin (float): Rotation speed in degrees per second.
+        '''
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.letter = letter
+        self.size = size
+        self.angle = angle
+        self.spin = spin
+        self.prev_x = x
+        self.prev_y = y
+        self.prev_angle = angle
+        self.far = False
+        self.lag = 0
+
+class Bullet:
+    '''
+    A bullet fired by the ship. Instances live in a Pool and are reused.
+    
+    prev_x and prev_y hold the position before the last simulation step, for render interpolation.
+    '''
+    __slots__ = ('x', 'y', 'vx', 'vy', 'life', 'prev_x', 'prev_y')
+    
+    def __init__(self, x=0, y=0, vx=0, vy=0, life=0):
+        self.set(x, y, vx, vy, life)
+    
+    def set(self, x, y, vx, vy, life):
+        '''
+        Overwrites every field, e.g. when the bullet is taken from a pool.
+        
+        Arguments:
+            x, y (float): Position.
+            vx, vy (float): Velocity in pixels per second.
+            life (float): Seconds left before the bullet disappears.
+        '''
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.life = life
+        self.prev_x = x
+        self.prev_y = y
+
+class Pool:
+    '''
+    Fixed set of reusable entities split into a live part and a free list.
+    
+    The live entities are items[:count] and every item after them is free. Taking an entity hands out the first
+    free one and removing an entity swaps the last live one into its slot, so neither allocates nor shifts the
+    rest of the list. Removing changes the order of the live entities. The pool only grows, by one entity at a
+    time, if more entities are live at once than its capacity.
+    
+    Arguments:
+        factory (type): Entity class, called without arguments to fill the pool.
+        capacity (int): Number of entities created up front.
+    '''
+    __slots__ = ('factory', 'items', 'count')
+    
+    def __init__(self, factory, capacity):
+        self.factory = factory
+        self.items = [factory() for _ in range(capacity)]
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        return islice(self.items, self.count)
+    
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("pool index out of range")
+        return self.items[index]
+    
+    def acquire(self):
+        '''
+        Takes an entity from the free list. Its fields still hold whatever it was last used for.
+        
+        Returns:
+            The entity, now the last live one.
+        '''
+        if self.count == len(self.items):
+            self.items.append(self.factory())
+        entity = self.items[self.count]
+        self.count += 1
+        return entity
+    
+    def release(self, index):
+        '''
+        Returns a live entity to the free list by swapping the last live entity into its slot.
+        
+        Arguments:
+            index (int): Index of the entity among the live ones.
+        '''
+        last = self.count - 1
+        items = self.items
+        items[index], items[last] = items[last], items[index]
+        self.count = last
+    
+    def clear(self):
+        '''
+        Returns every entity to the free list.
+        '''
+        self.count = 0
+
+# Asteroid functions
+def create_asteroids(state):
+    '''
+    Creates a new asteroid with randomized properties including position, velocity, size, rotation, and letter.
+    Ensures it doesn't spawn too close to the player's ship.
+    
+    Arguments:
+        state (GameState): Game the asteroid is created for (ship position, wave and random generator). The
+            asteroid is taken from its asteroid pool.
+    
+    Returns:
+        Asteroid: The new asteroid.
+    '''
+    rng = state.rng
+    for _ in range(SPAWN_ATTEMPTS):
+        x = rng.randint(0, state.world_width)
+        y = rng.randint(0, state.world_height)
+        if far_from_ship(x, y, state.ship_pos):
+            break # Avoid spawning too close to the ship
+    else:
+        x, y = opposite_ship(state.ship_pos, state.world_width, state.world_height) # Bounded: give up on random tries rather than loop forever
+    
+    # Fill a pooled asteroid with the properties
+    asteroid = state.asteroids.acquire()
+    asteroid.set(x, y, *random_asteroid(rng, state.current_wave))
+    return asteroid
+
+def random_asteroid(rng, current_wave):
+    '''
+    Picks the velocity, letter, size and rotation of a new asteroid.
+    
+    Arguments:
+        rng (random.Random): Random number generator to draw from.
+        current_wave (int): Wave the asteroid belongs to; later waves have faster and bigger asteroids.
+    
+    Returns:
+        tuple: (vx, vy, letter, size, angle, spin) as taken by Asteroid.set() after the position.
+    '''
+    # Generate random direction and scale speed with wave number     
+    angle = rng.uniform(0, 360)
+    speed = rng.uniform(50, 120)
+    speed *= (1 + current_wave/10)
+    # Calculate velocity components from angle and speed 
+    vx = math.cos(math.radians(angle)) * speed
+    vy = math.sin(math.radians(angle)) * speed
+    # Random letter (excluding 'A'), size, and rotation parameters
+    letter = rng.choice(string.ascii_uppercase[1:]) # B to Z
+    size = rng.randint(20, 45)
+    size *= (1 + current_wave/10)
+    rotation_angle = rng.uniform(0, 360)
+    rotation_speed = rng.uniform(-90, 90)
+    return vx, vy, letter, size, rotation_angle, rotation_speed
+
+def far_from_ship(x, y, ship_pos):
+    '''
+    Checks that a spawn point is outside the square kept clear around the ship.
+    
+    Arguments:
+        x, y (float): Spawn point.
+        ship_pos (list): Ship position.
+    
+    Returns:
+        bool: True if an asteroid may spawn there.
+    '''
+    return abs(x - ship_pos[0]) > SPAWN_SAFE_DISTANCE or abs(y - ship_pos[1]) > SPAWN_SAFE_DISTANCE
+
+def opposite_ship(ship_pos, width, height):
+    '''
+    Returns the point of the wrapping world farthest from the ship, the fallback spawn point.
+    
+    Arguments:
+        ship_pos (list): Ship position.
+        width, height (float): Size of the world.
+    
+    Returns:
+        tuple: (x, y) of the point.
+    '''
+    return (ship_pos[0] + width / 2) % width, (ship_pos[1] + height / 2) % height
+
+class WavePlan:
+    '''
+    Spawn points and asteroids of a wave, decided before the wave starts.
+    
+    A plan only depends on the game's seed, the wave number and the world size, never on the game's own random number generator,
+    so it can be made ahead of time (see WavePreparer) or right when the wave starts with the same result.
+    
+    Arguments:
+        wave (int): Wave number.
+        points (list): Candidate spawn points (x, y), spread out, more than there are asteroids so some can be
+            skipped for being near the ship.
+        asteroids (list): (vx, vy, letter, size, angle, spin) of every asteroid.
+    '''
+    __slots__ = ('wave', 'points', 'asteroids')
+    
+    def __init__(self, wave, points, asteroids):
+        self.wave = wave
+        self.points = points
+        self.asteroids = asteroids
+
+def world_screens(width, height):
+    '''
+    Returns how many playfields fit into a world. Asteroid counts are multiplied by it, so a larger world is as
+    crowded as the playfield.
+    
+    Arguments:
+        width, height (float): Size of the world.
+    
+    Returns:
+        int: Number of playfields, at least one.
+    '''
+    return max(1, round(width * height / (WIDTH * HEIGHT)))
+
+def wave_size(wave, screens=1):
+    '''
+    Returns the number of asteroids a wave starts with.
+    
+    Arguments:
+        wave (int): Wave number.
+        screens (int): Size of the world in playfields, see world_screens().
+    
+    Returns:
+        int: Asteroid count, growing with every wave.
+    '''
+    return (NUM_ASTEROIDS + wave) * screens
+
+def plan_wave(seed, wave, width=WIDTH, height=HEIGHT):
+    '''
+    Decides where the asteroids of a wave spawn and what they look like.
+    
+    Arguments:
+        seed (int): Seed of the game.
+        wave (int): Wave number.
+        width, height (float): Size of the world.
+    
+    Returns:
+        WavePlan: The plan, with about a quarter more spawn points than asteroids.
+    '''
+    rng = random.Random(f"{seed}/wave {wave}") # Its own generator, so planning early changes nothing
+    count = wave_size(wave, world_screens(width, height))
+    points = spread_points(rng, count + count // 4 + 2, width, height)
+    return WavePlan(wave, points, [random_asteroid(rng, wave) for _ in range(count)])
+
+def spread_points(rng, count, width, height):
+    '''
+    Picks random points on the wrapping world that keep a minimum distance from each other (Poisson-disc
+    dart throwing).
+    
+    Accepted points are kept in a grid of cells no wider than the minimum distance divided by the square root
+    of two, so each candidate is only checked against the points in the cells around it. At most
+    SPAWN_ATTEMPTS candidates are tried per point; if that runs out, the rest are placed without spacing.
+    
+    Arguments:
+        rng (random.Random): Random number generator to draw from.
+        count (int): Number of points.
+        width, height (float): Size of the world.
+    
+    Returns:
+        list: count (x, y) tuples.
+    '''
+    radius = SPAWN_SPACING * math.sqrt(width * height / count) # Well below the densest packing dart throwing reaches
+    columns = max(1, int(width / (radius / math.sqrt(2))))
+    rows = max(1, int(height / (radius / math.sqrt(2))))
+    cell_width = width / columns
+    cell_height = height / rows
+    reach_x = min(columns // 2, math.ceil(radius / cell_width)) # Cells to check either side
+    reach_y = min(rows // 2, math.ceil(radius / cell_height))
+    grid = {}
+    points = []
+    for _ in range(count * SPAWN_ATTEMPTS):
+        if len(points) == count:
+            break
+        x = rng.uniform(0, width)
+        y = rng.uniform(0, height)
+        column = int(x / cell_width)
+        row = int(y / cell_height)
+        fits = True
+        for other_column in range(column - reach_x, column + reach_x + 1):
+            for other_row in range(row - reach_y, row + reach_y + 1):
+                other = grid.get((other_column % columns, other_row % rows))
+                if other is None:
+                    continue
+                # Shortest distance across the wrapping edges
+                distance_x = abs(x - other[0])
+                distance_y = abs(y - other[1])
+                if min(distance_x, width - distance_x) ** 2 + min(distance_y, height - distance_y) ** 2 < radius ** 2:
+                    fits = False
+                    break
+            if not fits:
+                break
+        if fits and (column, row) not in grid:
+            grid[(column, row)] = (x, y)
+            points.append((x, y))
+    while len(points) < count:
+        points.append((rng.uniform(0, width), rng.uniform(0, height)))
+    return points
+
+def spawn_wave(state, plan):
+    '''
+    Adds the asteroids of a planned wave, each at the next planned point that is not near the ship.
+    
+    Arguments:
+        state (GameState): Game to add the asteroids to, taken from its asteroid pool.
+        plan (WavePlan): Plan of the wave.
+    '''
+    ship_pos = state.ship_pos
+    points = [point for point in plan.points if far_from_ship(point[0], point[1], ship_pos)]
+    for index, properties in enumerate(plan.asteroids):
+        x, y = points[index] if index < len(points) else opposite_ship(ship_pos, state.world_width, state.world_height)
+        state.asteroids.acquire().set(x, y, *properties)
+
+def init_asteroids(state):
+    '''
+    Initializes the asteroid pool with new asteroids.
+    
+    Arguments:
+        state (GameState): Game to add the asteroids to.
+    '''
+    for _ in range (NUM_ASTEROIDS * world_screens(state.world_width, state.world_height)):
+        create_asteroids(state)
+
+def split_asteroid(parent, rng, pool):
+    '''
+    Splits a given asteroid into two smaller ones if it is large enough.
+    
+    Arguments:
+        parent (Asteroid): The asteroid to be split. It is left in place.
+        rng (random.Random): Random number generator of the game.
+        pool (Pool): Asteroid pool the new asteroids are taken from; they become its last live entities.
+    
+    Returns:
+        int: Number of asteroids added, two or zero if parent is too small
+    '''
+    new_size = 0
+    
+    # Determine new size based on parent asteroid's size
+    if parent.size >= 90:
+        new_size = rng.randint(30, 60)
+    elif parent.size >= 50:
+        new_size = rng.randint(30, 45)
+    else:
+        return 0
+    
+    # Calculate parent's movement direction and speed
+    parent_vx, parent_vy = parent.vx, parent.vy
+    parent_angle = math.degrees(math.atan2(parent_vy, parent_vx))
+    parent_speed = math.hypot(parent_vx, parent_vy)
+    
+    # Create two new asteroids based on parent's motion with some variation
+    for _ in range(2):
+        angle_offset = rng.uniform(-20, 20) # Slight angle deviation
+        new_angle = parent_angle + angle_offset
+        speed_factor = rng.uniform(0.9, 1.1) # Slight speed variation
+        new_speed = parent_speed * speed_factor
+        vx = math.cos(math.radians(new_angle)) * new_speed
+        vy = math.sin(math.radians(new_angle)) * new_speed
+        letter = rng.choice(string.ascii_uppercase[1:]) # B to Z
+        
+        # Add new smaller asteroid at the parent's position with new velocity and rotation
+        rotation_angle = rng.uniform(0, 360)
+        rotation_speed = rng.uniform(-90, 90)
+        pool.acquire().set(parent.x, parent.y, vx, vy, letter, new_size, rotation_angle, rotation_speed)
+        
+    return 2
+
+# Bullet functions
+def create_bullet(state):
+    '''
+    Creates a new bullet object starting from the ship's current position, moving it in the direction the ship is facing
+    with a fixed speed and lifespan.
+    
+    Arguments:
+        state (GameState): Game whose ship fires the bullet. The bullet is taken from its bullet pool.
+    
+    Returns:
+        Bullet: The new bullet.
+    '''
+    
+    bullet_angle = state.ship_angle - 90 # Adjust angle so bullet moves forward relative to ship's orientation
+    bullet_speed = 400 # Speed at which bullets travels (pixels per second)
+    x = state.ship_pos[0] # Initial bullet x-position (ship's x)
+    y = state.ship_pos[1] # Initial bullet y-position (ship's y)
+    # Calculate velocity components using trigonometry
+    vx = math.cos(math.radians(bullet_angle)) * bullet_speed
+    vy = math.sin(math.radians(bullet_angle)) * bullet_speed
+    bullet = state.bullets.acquire()
+    bullet.set(x, y, vx, vy, BULLET_LIFESPAN)
+    return bullet
+
+# Star functions
+def init_stars(state):
+    '''
+    Initializes the starfield by creating stars with randomized positions, brightness, twinkle speed, and parallax speed factor.
+    Stars are stored as lists. Positions are relative to the star's depth layer, which scrolls as a whole.
+    
+    Arguments:
+        state (GameState): Game to add the stars to.
+    '''
+    rng = state.rng
+    for _ in range(NUM_STARS):
+        x = rng.randint(0, WIDTH) # Random horizontal position across the screen
+        y = rng.randint(0, HEIGHT) # Random vertival position across the screen
+        brightness = rng.randint(100, 255) # Star brightness (controlls how light/dark)
+        twinkle_speed = rng.choice([-1, 1]) * rng.uniform(0.5, 2) # Twinkle speed determines how fast brightness changes, + or - for direction
+        speed_factor = rng.uniform(0.1, 1.0) # parallax speed
+        state.stars.append([x, y, brightness, twinkle_speed, speed_factor]) # Add star with position, brightness, twinkle speed, and speed_factor
+
+def star_layer(speed_factor):
+    '''
+    Returns the depth layer a star belongs to based on its parallax speed factor.
+    
+    Arguments:
+        speed_factor (float): Parallax speed factor between 0.1 and 1.0.
+    
+    Returns:
+        int: Index into STAR_LAYER_SPEEDS.
+    '''
+    return min(len(STAR_LAYER_SPEEDS) - 1, int((speed_factor - 0.1) / 0.9 * len(STAR_LAYER_SPEEDS)))
@@ -0,0 +1,284 @@
+'''
+The windowed game: display setup, keyboard input and the main loop.
+'''
+import os
+import time
+import struct
+import pygame
+
+from .config import (FPS, SIM_DT, MAX_FRAME_TIME, DEBUG_HISTORY, FRAME_BUDGET_MS, DIRTY_RECTS, PRECISE_COLLISIONS,
+                     ADAPTIVE_QUALITY, RENDER_SCALE, WINDOW_SIZE, FULLSCREEN, SMOOTH_SCALING, WORLD_SIZE, LOW_GARBAGE,
+                     MEMORY_STATS, CAPTURE_FORMAT, CAPTURE_INTERVAL, QUICKSAVE_PATH, REWIND_STEPS, ENTITY_STORE)
+from .simulation import INPUT_LEFT, INPUT_RIGHT, INPUT_THRUST, INPUT_FIRE, INPUT_DOWN, GameState, step
+from .profiling import profiler_hooks, FrameTimer
+from .hud import DebugOverlay
+from .render import DirtyRectRenderer, Display, draw_game, draw_main_menu, draw_GAMEOVER
+from .viewport import viewport
+from .quality import QualityGovernor
+from .preload import WavePreparer
+from .memory import MemoryMonitor, GarbageScheduler, report_memory
+from .capture import FrameCapture, report_capture
+from .replay import Recording, report_replay
+from .snapshot import Snapshot, SnapshotError, Rewind
+
+def init_display(window_size=WINDOW_SIZE, fullscreen=FULLSCREEN):
+    '''
+    Starts only the pygame subsystems the game uses and opens the window.
+    
+    Arguments:
+        window_size (tuple or None): Width and height of the window, None for the viewport's size, or the desktop
+            resolution when fullscreen.
+        fullscreen (bool): Fill the screen instead of opening a window.
+    
+    Returns:
+        pygame.Surface: The display surface.
+    '''
+    pygame.display.init()
+    pygame.font.init()
+    if fullscreen:
+        screen = pygame.display.set_mode(window_size or (0, 0), pygame.FULLSCREEN)
+    else:
+        screen = pygame.display.set_mode(window_size or viewport.size)
+    pygame.display.set_caption("Alphastroid")
+    return screen
+
+def read_input(pressed_keys):
+    '''
+    Converts the keyboard state into the input bitmask used by step().
+    
+    Arguments:
+        pressed_keys: Key state as returned by pygame.key.get_pressed().
+    
+    Returns:
+        int: Combination of the INPUT_* flags.
+    '''
+    keys = 0
+    if pressed_keys[pygame.K_LEFT] or pressed_keys[pygame.K_a]:
+        keys |= INPUT_LEFT
+    if pressed_keys[pygame.K_RIGHT] or pressed_keys[pygame.K_d]:
+        keys |= INPUT_RIGHT
+    if pressed_keys[pygame.K_UP] or pressed_keys[pygame.K_w]:
+        keys |= INPUT_THRUST
+    if pressed_keys[pygame.K_SPACE]:
+        keys |= INPUT_FIRE
+    if pressed_keys[pygame.K_DOWN] or pressed_keys[pygame.K_s]:
+        keys |= INPUT_DOWN
+    return keys
+
+def main(dirty_rects=DIRTY_RECTS, record=None, replay=None, precise_collisions=PRECISE_COLLISIONS, fps=FPS,
+         adaptive_quality=ADAPTIVE_QUALITY, render_scale=RENDER_SCALE, window_size=WINDOW_SIZE, fullscreen=FULLSCREEN,
+         smooth_scaling=SMOOTH_SCALING, world_size=WORLD_SIZE, low_garbage=LOW_GARBAGE, memory_stats=MEMORY_STATS,
+         capture=None, capture_format=CAPTURE_FORMAT, capture_interval=CAPTURE_INTERVAL, quicksave=QUICKSAVE_PATH,
+         entity_store=ENTITY_STORE):
+    '''
+    Runs the game in a window until it is closed.
+    
+    The simulation advances in fixed SIM_DT steps, as many per frame as the time since the last frame covers,
+    and every frame is drawn interpolated between the last two steps. The frame rate therefore only affects
+    how smooth the game looks, not how it plays. Likewise the game is drawn at render_scale times the playfield and
+    scaled to the window once per frame, so neither the render resolution nor the window size change the game.
+    
+    Arguments:
+        dirty_rects (bool): Redraw and present only the changed parts of the screen while playing.
+        record (str or None): File to save a recording of every game to, overwritten by each new game.
+        replay (Recording or None): Recording to play back at normal speed instead of starting at the menu.
+        precise_collisions (bool): Check hits against the letters' pixels instead of their bounding circles.
+        fps (int): Frames drawn per second, 0 for as many as possible.
+        adaptive_quality (bool): Lower the drawing quality while frames take longer than the frame budget.
+        render_scale (float): Resolution the game is drawn at, relative to the playfield.
+        window_size (tuple or None): Width and height of the window, None for the render resolution.
+        fullscreen (bool): Fill the screen, at the desktop resolution unless window_size is given.
+        smooth_scaling (bool): Scale the drawn frame to the window with smoothscale() instead of scale().
+        world_size (tuple): Width and height of the wrapping world; in a world larger than the playfield the view
+            follows the ship.
+        low_garbage (bool): Freeze long-lived objects and only collect garbage at safe points such as wave
+            transitions and the respawn delay.
+        memory_stats (bool): Measure garbage collections and allocations per frame and phase, shown in the
+            performance overlay and printed when the window is closed.
+        capture (str or None): Directory or file to capture every drawn frame to, at the render resolution and
+            without the performance overlay. Frames are dropped rather than slowing the game down.
+        capture_format (str): 'png' for numbered PNG files in the capture directory, 'raw' for one RGB stream.
+        capture_interval (int): Capture every Nth drawn frame.
+        quicksave (str): File F5 saves the game in progress to and F9 loads it from. F8 rewinds the game by a
+            second, also after the game is over. Loading and rewinding are off while recording or replaying.
+        entity_store (bool): Keep the asteroids and bullets in a NumPy EntityStore, for worlds with thousands of them.
+    '''
+    viewport.set_scale(render_scale)
+    display = Display(init_display(window_size, fullscreen), smooth_scaling)
+    screen = display.surface # Everything but the performance overlay is drawn here
+    clock = pygame.time.Clock()
+    dirty_renderer = DirtyRectRenderer() if dirty_rects else None
+    game_state = "MENU"
+    state = GameState() # Provides the stars behind the main menu
+    recording = None # Recording of the game in progress when recording
+    replay_inputs = None # Remaining recorded frames when replaying
+    if replay is not None:
+        state = replay.new_game(entity_store)
+        replay_inputs = replay.inputs()
+        game_state = "PLAYING"
+    frame_timer = FrameTimer(DEBUG_HISTORY, profiler_hooks)
+    debug_overlay = DebugOverlay()
+    # Uncapped frames still aim for the default frame rate
+    quality = QualityGovernor(1000 / fps if fps else FRAME_BUDGET_MS, profiler_hooks) if adaptive_quality else None
+    wave_preparer = WavePreparer()
+    memory = MemoryMonitor(profiler_hooks, trace_allocations=True) if memory_stats else None
+    if memory is not None:
+        memory.start()
+    garbage = GarbageScheduler() if low_garbage else None
+    frame_capture = FrameCapture(capture, capture_format, interval=capture_interval) if capture else None
+    # Going back in time would leave a recording that no longer replays
+    rewind = Rewind() if not record and replay is None else None
+    if garbage is not None:
+        garbage.start() # Everything loaded so far lives as long as the window
+    accumulator = 0 # Real time not yet simulated, in seconds
+    running = True
+    while running:
+        # Control frame rate and add the real time that passed to what the simulation has to catch up on
+        accumulator += min(clock.tick(fps) / 1000, MAX_FRAME_TIME)
+        frame_start = time.perf_counter()
+        
+        # Only time the frame when someone is looking at the numbers
+        timer = frame_timer if debug_overlay.visible or profiler_hooks.active else None
+        if timer:
+            timer.begin_frame()
+        
+        # Handle events such as key presses
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False # This will exit the main loop and close the game
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    debug_overlay.toggle() # Show or hide the performance overlay
+                elif event.key == pygame.K_F5 and game_state == "PLAYING":
+                    try:
+                        Snapshot(state).save(quicksave)
+                    except (struct.error, OSError) as error:
+                        print("Cannot quick-save:", error) # Such as an unwritable file, the game goes on either way
+                    else:
+                        print("Quick-saved to", quicksave)
+                elif event.key == pygame.K_F9 and rewind is not None and os.path.exists(quicksave):
+                    try:
+                        state = Snapshot.load(quicksave).new_game(entity_store)
+                    except (SnapshotError, OSError) as error:
+                        print("Cannot load the quick-save:", error)
+                    else:
+                        rewind.clear()
+                        if garbage is not None:
+                            garbage.freeze()
+                        game_state = "PLAYING"
+                elif event.key == pygame.K_F8 and rewind is not None and game_state != "MENU":
+                    if rewind.rewind(state, REWIND_STEPS):
+                        game_state = "PLAYING" # Also back from the game over screen, to just before the last life was lost
+                elif game_state == "MENU":
+                    # Start the game from the main menu
+                    if event.key == pygame.K_SPACE:
+                        state = GameState(show_instructions=state.first_time_instructions_overlay,
+                                          precise_collisions=precise_collisions, world_size=world_size,
+                                          entity_store=entity_store)
+                        if garbage is not None:
+                            garbage.freeze() # The new game's pools live as long as the game
+                        if record:
+                            recording = Recording.for_game(state)
+                        if rewind is not None:
+                            rewind.clear()
+                        game_state = "PLAYING"
+                elif game_state == "GAMEOVER":
+                    # Return to main menu from game over screen
+                    draw_GAMEOVER(screen)
+                    if event.key == pygame.K_SPACE:
+                        game_state = "MENU"
+        
+        # Get the current state of all keys for continous input handling
+        keys = read_input(pygame.key.get_pressed())
+        
+        if game_state == "MENU":
+            draw_main_menu(screen, state) # Display main menu screen
+        
+        rects = None # Areas drawn on this frame when only those are presented
+        if game_state != "PLAYING":
+            accumulator = 0 # Nothing to catch up on when a game starts
+        
+        # Run as many fixed steps as the elapsed time covers
+        while game_state == "PLAYING" and accumulator >= SIM_DT:
+            dt = SIM_DT
+            if replay_inputs is not None:
+                # Play the recorded step instead of the keyboard, paced by the real clock
+                keys, dt = next(replay_inputs, (None, None))
+                if keys is None:
+                    replay_inputs = None
+                    report_replay(replay, state)
+                    game_state = "GAMEOVER"
+                    break
+            if recording is not None:
+                recording.record(keys, dt)
+            step(state, keys, dt, timer)
+            if rewind is not None:
+                rewind.update(state)
+            accumulator -= dt
+            if state.game_over:
+                game_state = "GAMEOVER" # Transition to GAMEOVER if no lives remain
+                if recording is not None:
+                    recording.finish(state)
+                    recording.save(record)
+                    recording = None
+                if replay_inputs is not None:
+                    replay_inputs = None
+                    report_replay(replay, state)
+        
+        if game_state == "PLAYING":
+            # Draw in between the last two steps by the fraction of a step that is still unsimulated
+            rects = draw_game(screen, state, timer, dirty_renderer, accumulator / SIM_DT)
+            wave_preparer.update(state) # Get the next wave ready a little at a time
+            if timer:
+                timer.lap("prepare_wave")
+        
+        elif game_state == "GAMEOVER":
+            # If the game is over, display the "GAME OVER" screen
+            draw_GAMEOVER(screen)
+        
+        if garbage is not None:
+            garbage.update(state, game_state == "PLAYING") # Collect at safe points only
+            if timer:
+                timer.lap("collect_garbage")
+        
+        if frame_capture is not None:
+            frame_capture.capture(screen) # Copied as drawn, encoded in the capture process
+            if timer:
+                timer.lap("capture_frame")
+        
+        if timer:
+            timer.end_frame()
+        display.present() # Scale the frame to the window if it was drawn offscreen
+        if debug_overlay.visible:
+            # Drawn at the window's own resolution so the text stays sharp
+            overlay_rect = debug_overlay.draw(display.window, clock.get_fps(), frame_timer,
+                                              state if game_state == "PLAYING" else None, quality, memory)
+            if rects is not None:
+                rects.append(display.from_window(overlay_rect))
+        
+        # Update display surface to the screen
+        if dirty_renderer is not None and rects is not None:
+            dirty_renderer.present(rects, display)
+        else:
+            display.update()
+            if dirty_renderer is not None:
+                dirty_renderer.invalidate() # Another screen was shown, so the next game frame starts from scratch
+        
+        if quality is not None:
+            # Judge the time the frame took to simulate, draw and present, without the wait for the frame rate
+            quality.update((time.perf_counter() - frame_start) * 1000)
+    
+    if recording is not None:
+        # Keep the game that was interrupted by closing the window
+        recording.finish(state)
+        recording.save(record)
+    wave_preparer.close()
+    if garbage is not None:
+        garbage.stop()
+    if memory is not None:
+        memory.stop()
+        report_memory(memory)
+    if frame_capture is not None:
+        frame_capture.close()
+        report_capture(frame_capture)
+    pygame.quit()
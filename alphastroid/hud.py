@@ -0,0 +1,229 @@
+'''
+Text labels, the in-game HUD and the performance overlay.
+'''
+import pygame
+
+from .config import FRAME_BUDGET_MS
+from .caches import font_cache, get_font, sprite_cache
+from .viewport import viewport
+
+# Text functions
+class TextLabel:
+    '''
+    Text whose rendered surface is kept and only re-rendered when the text or the viewport's scale changes.
+    
+    Arguments:
+        size (int): Font size in points at a scale of 1.
+        color (tuple): RGB color of the text.
+    '''
+    def __init__(self, size, color=(255, 255, 255)):
+        self.size = size
+        self.color = color
+        self.text = None # Text the surface was rendered from
+        self.scale = None # Viewport scale the surface was rendered at
+        self.surface = None
+    
+    def render(self, text):
+        '''
+        Returns the rendered text, rendering it only if it differs from last time.
+        
+        Arguments:
+            text (str): Text to show.
+        
+        Returns:
+            pygame.Surface: The rendered text.
+        '''
+        if text != self.text or viewport.scale != self.scale:
+            self.text = text
+            self.scale = viewport.scale
+            self.surface = get_font(self.size * self.scale).render(text, True, self.color)
+        return self.surface
+
+# Labels for every piece of text in the game, each bound to one on-screen value
+title_label = TextLabel(50)
+start_prompt_label = TextLabel(25)
+score_label = TextLabel(25)
+wave_label = TextLabel(25)
+lives_label = TextLabel(25)
+gameover_label = TextLabel(55, (178, 31, 31)) # Darker red color
+playagain_label = TextLabel(15)
+instruction_label = TextLabel(16)
+
+def draw_score(surface, score, special_flags=0):
+    '''
+    Displays the current score on the top left corner of the screen.
+    
+    Arguments:
+        surface: Pygame surface to draw the score on.
+        score (int): Score to display.
+        special_flags (int): Blend flags for the blit, used when composing the HUD layer.
+    
+    Returns:
+        pygame.Rect: Area that was drawn on.
+    '''
+    
+    text = score_label.render(f"Score: {score}") # Re-rendered only when the score changes
+    return surface.blit(text, (viewport.pixels(10), viewport.pixels(10)), special_flags=special_flags) # Draw score at (10, 10), scaled to the viewport
+    
+def draw_wave(surface, current_wave, special_flags=0):
+    '''
+    Displays the current wave number on the screen just below the score.
+    
+    Arguments:
+        surface: Pygame surface to draw the score on.
+        current_wave (int): Wave number to display.
+        special_flags (int): Blend flags for the blit, used when composing the HUD layer.
+    
+    Returns:
+        pygame.Rect: Area that was drawn on.
+    '''
+    text = wave_label.render(f"Wave: {current_wave}") # Re-rendered only when the wave changes
+    return surface.blit(text, (viewport.pixels(10), viewport.pixels(40)), special_flags=special_flags) # Draw wave at (10, 40), scaled to the viewport
+
+def draw_lives(surface, lives, special_flags=0):
+    '''
+    Displays the player's remaining lives on the screen using the letter 'A' as a visual symbol.
+    
+    Arguments:
+        surface: Pygame surface to draw the lives on.
+        lives (int): Number of lives to display.
+        special_flags (int): Blend flags for the blit, used when composing the HUD layer.
+    
+    Returns:
+        pygame.Rect: Area that was drawn on.
+    '''
+    lives_quantity = "A " * lives # Calculating amount of A's based on lives
+    text = lives_label.render(f"Lives: {lives_quantity}") # Re-rendered only when a life is lost
+    return surface.blit(text, (viewport.pixels(10), viewport.pixels(70)), special_flags=special_flags) # Draw lives at (10, 70), scaled to the viewport
+
+class HudLayer:
+    '''
+    Score, wave and lives composited into one transparent surface that is drawn once per frame.
+    
+    The layer is only recomposed when one of the values changes, which happens on hits, wave transitions and deaths,
+    and at most once every update_interval frames. It has the size of the viewport.
+    '''
+    def __init__(self):
+        self.surface = None # Created on first use
+        self.values = None # (score, wave, lives) the layer was composed from
+        self.area = None # Part of the layer holding text
+        self.update_interval = 1 # Frames between recompositions, raised when drawing quality is lowered
+        self.age = 0 # Frames since the layer was last composed
+    
+    def compose(self, score, current_wave, lives):
+        '''
+        Returns the HUD to draw this frame, recomposing it first if any value changed.
+        
+        Arguments:
+            score (int): Score to display.
+            current_wave (int): Wave number to display.
+            lives (int): Number of lives to display.
+        
+        Returns:
+            tuple: The part of the layer holding text and the position to draw it at, ready for the render queue.
+        '''
+        if self.surface is None or self.surface.get_size() != viewport.size:
+            self.surface = pygame.Surface(viewport.size, pygame.SRCALPHA)
+            self.values = None
+            self.area = None
+        values = (score, current_wave, lives)
+        self.age += 1
+        if values != self.values and (self.age >= self.update_interval or self.values is None):
+            self.values = values
+            self.age = 0
+            if self.area is not None:
+                self.surface.fill((0, 0, 0, 0), self.area) # Clear the old text
+            # BLEND_RGBA_MAX copies the text's own alpha instead of blending it with the transparent layer
+            rects = [draw_score(self.surface, score, pygame.BLEND_RGBA_MAX),
+                     draw_wave(self.surface, current_wave, pygame.BLEND_RGBA_MAX),
+                     draw_lives(self.surface, lives, pygame.BLEND_RGBA_MAX)]
+            self.area = rects[0].unionall(rects[1:])
+        return self.surface.subsurface(self.area), self.area.topleft
+
+hud_layer = HudLayer() # Shared HUD for the game screen
+
+# Performance overlay
+class DebugOverlay:
+    '''
+    Toggleable panel showing FPS, a frame time sparkline, entity counts, cache statistics and per-phase timings.
+    
+    Arguments:
+        font_size (int): Size of the overlay text.
+    '''
+    def __init__(self, font_size=12):
+        self.visible = False
+        self.font_size = font_size
+        self.panel = None # Reused translucent background, created on first draw
+    
+    def toggle(self):
+        '''
+        Shows the overlay if hidden and hides it if shown.
+        '''
+        self.visible = not self.visible
+    
+    def draw(self, surface, fps, timer, state=None, quality=None, memory=None):
+        '''
+        Draws the overlay in the top right corner.
+        
+        Arguments:
+            surface: Pygame surface to draw on.
+            fps (float): Measured frames per second.
+            timer (FrameTimer): Timer holding the recent frame and phase times.
+            state (GameState or None): Game whose entities are counted.
+            quality (QualityGovernor or None): Governor whose quality level is shown.
+            memory (MemoryMonitor or None): Monitor whose collector time and allocations are shown.
+        
+        Returns:
+            pygame.Rect: Area that was drawn on.
+        '''
+        font = get_font(self.font_size)
+        line_height = font.get_linesize()
+        frame_times = timer.frame_times
+        last_frame = frame_times[-1] if frame_times else 0
+        
+        lines = [f"FPS {fps:.0f}  frame {last_frame:.2f} ms"]
+        if state is not None:
+            lines.append(f"asteroids {len(state.asteroids)}  bullets {len(state.bullets)}")
+            lines.append(f"fragments {len(state.ship_fragments)}  stars {len(state.stars)}")
+        fonts = font_cache.stats()
+        sprites = sprite_cache.stats()
+        lines.append(f"fonts {fonts['fonts']}  hit {fonts['hits']}  miss {fonts['misses']}")
+        lines.append(f"sprites {sprites['sprites']}  {sprites['bytes'] // 1024} KB  miss {sprites['misses']}")
+        if quality is not None:
+            settings = quality.settings()
+            lines.append(f"quality {settings['level']}  stars {settings['star_density']:.0%}  "
+                         f"step {settings['angle_step']}")
+        if memory is not None:
+            recent = memory.recent()
+            lines.append(f"gc {recent['gc_ms']:.2f} ms  max {recent['max_gc_ms']:.2f}  runs {recent['collections']}")
+            if memory.trace_allocations:
+                lines.append(f"alloc {recent['allocated'] / 1024:.1f} KB  kept {recent['retained'] / 1024:.1f} KB")
+        # Slowest phases first
+        phases = sorted(timer.recent_phase_means().items(), key=lambda item: item[1], reverse=True)
+        lines.extend(f"{phase} {elapsed:.2f} ms" for phase, elapsed in phases[:8])
+        
+        # Size the panel to fit the text and a sparkline of every kept frame
+        graph_height = 30
+        width = max(self.font_size * 16, 2 * (timer.history or len(frame_times)) + 8)
+        height = line_height * len(lines) + graph_height + 12
+        if self.panel is None or self.panel.get_size() != (width, height):
+            self.panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            self.panel.fill((0, 0, 0, 170))
+        left = surface.get_width() - width - 5
+        top = 5
+        panel_rect = surface.blit(self.panel, (left, top))
+        
+        for index, line in enumerate(lines):
+            surface.blit(font.render(line, True, (255, 255, 255)), (left + 4, top + 4 + index * line_height))
+        
+        # Sparkline of frame times, scaled so the frame budget sits halfway up the graph
+        graph_bottom = top + height - 4
+        budget_y = graph_bottom - graph_height // 2
+        pygame.draw.line(surface, (120, 120, 120), (left + 4, budget_y), (left + width - 4, budget_y))
+        if len(frame_times) > 1:
+            scale = (graph_height / 2) / FRAME_BUDGET_MS
+            points = [(left + 4 + index * 2, graph_bottom - min(frame_time * scale, graph_height))
+                      for index, frame_time in enumerate(frame_times)]
+            color = (255, 80, 80) if last_frame > FRAME_BUDGET_MS else (80, 255, 120)
+            pygame.draw.lines(surface, color, False, points)
+        return panel_rect
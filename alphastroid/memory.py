@@ -0,0 +1,275 @@
+'''
+Garbage collector and allocation telemetry, and the low-garbage play mode.
+
+Neither changes how a game plays; they only change when Python's cyclic garbage collector runs and what is
+measured about it.
+'''
+import gc
+import time
+import tracemalloc
+from collections import deque
+
+from .config import DEBUG_HISTORY, GC_PENDING_LIMIT
+from .profiling import summarize_times
+
+class MemoryMonitor:
+    '''
+    Measures garbage collector pauses and the memory allocated in every frame and every phase of it.
+    
+    Collector pauses are timed through gc.callbacks. Allocations are traced with tracemalloc, which slows Python
+    down considerably, so they are only measured when trace_allocations is set. Both are split into frames and
+    phases by the same frame and phase markers FrameTimer sends to the hooks, so a pause or an allocation is
+    charged to the phase that was running when it happened. Each collection is also sent to the hooks as a 'gc'
+    event.
+    
+    For every phase, 'allocated' is how far memory use rose above where it started (the peak), which counts
+    short-lived garbage too, and 'retained' is what was still in use at the end of it.
+    
+    Arguments:
+        hooks (ProfilerHooks): Hooks the frame and phase markers come from.
+        trace_allocations (bool): Also measure allocations with tracemalloc.
+        history (int): Number of recent frames to keep.
+    '''
+    def __init__(self, hooks, trace_allocations=False, history=DEBUG_HISTORY):
+        self.hooks = hooks
+        self.trace_allocations = trace_allocations
+        self.frames = deque(maxlen=history) # Per frame dicts with 'gc_ms', 'allocated', 'retained' and 'phases'
+        # Every collection since start(): how many, their total and longest pause, and how many per generation
+        self.collections = {'count': 0, 'total_ms': 0, 'max_ms': 0, 'by_generation': [0, 0, 0]}
+        self.running = False
+        self.started_tracing = False # Whether tracemalloc was started here, and so is stopped here too
+        self.current = None # Measurements of the frame in progress
+        self.phase_gc_ms = 0 # Collector time since the last marker
+        self.gc_start = 0
+        self.last_traced = 0 # Traced memory at the last marker
+    
+    def start(self):
+        '''
+        Starts measuring, from the next frame on.
+        '''
+        if self.running:
+            return
+        gc.callbacks.append(self.on_gc)
+        self.hooks.subscribe('frame_begin', self.on_frame_begin)
+        self.hooks.subscribe('phase', self.on_phase)
+        self.hooks.subscribe('frame_end', self.on_frame_end)
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.running = True
+    
+    def stop(self):
+        '''
+        Stops measuring. What was measured is kept.
+        '''
+        if not self.running:
+            return
+        gc.callbacks.remove(self.on_gc)
+        self.hooks.unsubscribe('frame_begin', self.on_frame_begin)
+        self.hooks.unsubscribe('phase', self.on_phase)
+        self.hooks.unsubscribe('frame_end', self.on_frame_end)
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        self.running = False
+        self.current = None
+    
+    def on_gc(self, phase, info):
+        '''
+        Times a collection. Called by the garbage collector before and after it runs.
+        '''
+        if phase == 'start':
+            self.gc_start = time.perf_counter()
+            return
+        pause = (time.perf_counter() - self.gc_start) * 1000
+        collections = self.collections
+        collections['count'] += 1
+        collections['total_ms'] += pause
+        collections['max_ms'] = max(collections['max_ms'], pause)
+        collections['by_generation'][info['generation']] += 1
+        self.phase_gc_ms += pause
+        if self.current is not None:
+            self.current['gc_ms'] += pause
+            self.current['collections'] += 1
+        self.hooks.emit('gc', info['generation'], pause, info['collected'])
+    
+    def on_frame_begin(self, frame):
+        '''
+        Starts the measurements of a frame.
+        '''
+        self.current = {'gc_ms': 0, 'collections': 0, 'allocated': 0, 'retained': 0, 'phases': {}}
+        self.phase_gc_ms = 0
+        if self.trace_allocations:
+            self.last_traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+    
+    def on_phase(self, phase, elapsed_ms):
+        '''
+        Charges what happened since the last marker to the phase that just ended.
+        '''
+        if self.current is None:
+            return
+        allocated = retained = 0
+        if self.trace_allocations:
+            traced, peak = tracemalloc.get_traced_memory()
+            allocated = peak - self.last_traced
+            retained = traced - self.last_traced
+            self.last_traced = traced
+            tracemalloc.reset_peak()
+        # A phase lapped several times in one frame is summed, as FrameTimer does
+        totals = self.current['phases'].setdefault(phase, {'gc_ms': 0, 'allocated': 0, 'retained': 0})
+        totals['gc_ms'] += self.phase_gc_ms
+        totals['allocated'] += allocated
+        totals['retained'] += retained
+        self.current['allocated'] += allocated
+        self.current['retained'] += retained
+        self.phase_gc_ms = 0
+    
+    def on_frame_end(self, frame, frame_ms):
+        '''
+        Stores the measurements of the frame that just ended.
+        '''
+        if self.current is not None:
+            self.frames.append(self.current)
+            self.current = None
+    
+    def recent(self):
+        '''
+        Averages the kept frames, for the performance overlay.
+        
+        Returns:
+            dict: Mean 'gc_ms', 'allocated' and 'retained' per frame, 'max_gc_ms' of a single frame and the number
+            of 'collections' in the kept frames.
+        '''
+        count = len(self.frames) or 1
+        return {
+            'gc_ms': sum(frame['gc_ms'] for frame in self.frames) / count,
+            'max_gc_ms': max((frame['gc_ms'] for frame in self.frames), default=0),
+            'collections': sum(frame['collections'] for frame in self.frames),
+            'allocated': sum(frame['allocated'] for frame in self.frames) / count,
+            'retained': sum(frame['retained'] for frame in self.frames) / count,
+        }
+    
+    def report(self):
+        '''
+        Summarizes the collections since start() and the kept frames.
+        
+        Returns:
+            dict: 'collections' with the count, total and longest pause and the count per generation, 'frame' with
+            mean and tail percentiles of the collector time and allocations per frame, and 'phases' with the mean
+            collector time and allocations of every phase.
+        '''
+        phases = {}
+        for frame in self.frames:
+            for phase, totals in frame['phases'].items():
+                summary = phases.setdefault(phase, {'gc_ms': 0, 'allocated': 0, 'retained': 0})
+                for name, value in totals.items():
+                    summary[name] += value / len(self.frames)
+        return {
+            'collections': dict(self.collections, by_generation=self.collections['by_generation'][:]),
+            'frame': {name: summarize_times([frame[name] for frame in self.frames])
+                      for name in ('gc_ms', 'allocated', 'retained')},
+            'phases': phases,
+        }
+
+class GarbageScheduler:
+    '''
+    Low-garbage play mode: the garbage collector never runs on its own, only at safe points.
+    
+    Almost all garbage in the game is freed right away by reference counting; the cyclic collector only exists
+    for reference cycles, and its pauses grow with the number of objects alive. So when a game starts, everything
+    alive (assets, caches, the game's pools) is collected once and then frozen with gc.freeze(), which hides it
+    from every later collection. From then on collections only run at safe points where a pause goes unnoticed: on
+    the first frame of a new wave, while the ship waits to respawn and on the menu and game over screens. Should
+    the young generation pile up past pending_limit objects in between, it alone is collected, which is quick.
+    
+    Arguments:
+        pending_limit (int): Young objects allowed to pile up before they are collected outside a safe point.
+    '''
+    def __init__(self, pending_limit=GC_PENDING_LIMIT):
+        self.pending_limit = pending_limit
+        self.was_enabled = True # Whether automatic collection was on before start()
+        self.running = False
+        self.safe = False # Whether the last frame was at a safe point
+        self.wave = None # Wave of the last frame
+        self.collections = {'safe': 0, 'forced': 0} # Collections run at safe points and outside of them
+        self.pause_ms = 0 # Total time spent in those collections
+    
+    def start(self):
+        '''
+        Turns automatic collection off and freezes everything alive.
+        '''
+        if not self.running:
+            self.was_enabled = gc.isenabled()
+            gc.disable()
+            self.running = True
+        self.freeze()
+    
+    def freeze(self):
+        '''
+        Collects everything, including what an earlier freeze() hid, and freezes what is left. Call when a game starts.
+        '''
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+    
+    def update(self, state, playing):
+        '''
+        Runs a collection if the frame is a safe point, or if too much garbage piled up. Call once per frame.
+        
+        Arguments:
+            state (GameState): Game shown this frame.
+            playing (bool): Whether the game is being played, rather than a menu or game over screen being shown.
+        
+        Returns:
+            bool: True if a collection ran.
+        '''
+        if not self.running:
+            return False
+        safe = not playing or not state.ship_alive or state.current_wave != self.wave
+        start = time.perf_counter()
+        if safe and not self.safe:
+            gc.collect() # Once per safe point; frozen objects are skipped, so this is quick
+            self.collections['safe'] += 1
+        elif gc.get_count()[0] > self.pending_limit:
+            gc.collect(0)
+            self.collections['forced'] += 1
+        else:
+            start = None
+        self.safe = safe
+        self.wave = state.current_wave
+        if start is None:
+            return False
+        self.pause_ms += (time.perf_counter() - start) * 1000
+        return True
+    
+    def stop(self):
+        '''
+        Turns automatic collection back on if it was on before, and unfreezes what was frozen.
+        '''
+        if not self.running:
+            return
+        gc.unfreeze()
+        if self.was_enabled:
+            gc.enable()
+        self.running = False
+
+def report_memory(monitor):
+    '''
+    Prints the garbage collections a monitor saw and the phases that allocated the most per frame.
+    
+    Arguments:
+        monitor (MemoryMonitor): Monitor to report on.
+    '''
+    report = monitor.report()
+    collections = report['collections']
+    print(f"Garbage collections: {collections['count']} (generations {'/'.join(map(str, collections['by_generation']))}), "
+          f"{collections['total_ms']:.1f} ms in total, longest {collections['max_ms']:.2f} ms")
+    frame = report['frame']
+    print(f"Per frame: collector {frame['gc_ms']['mean']:.3f} ms (p99 {frame['gc_ms']['p99']:.3f} ms), "
+          f"allocated {frame['allocated']['mean'] / 1024:.1f} KB, retained {frame['retained']['mean'] / 1024:.1f} KB")
+    # Biggest allocators first
+    phases = sorted(report['phases'].items(), key=lambda item: item[1]['allocated'], reverse=True)
+    for phase, totals in phases[:8]:
+        print(f"    {phase}: allocated {totals['allocated'] / 1024:.1f} KB, retained {totals['retained'] / 1024:.1f} KB, "
+              f"collector {totals['gc_ms']:.3f} ms")
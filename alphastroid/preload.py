@@ -0,0 +1,81 @@
+'''
+Preparing the next wave while the current one is played.
+'''
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import WAVE_WARM_BUDGET_MS
+from .caches import sprite_cache
+from .entities import plan_wave
+from .viewport import viewport
+
+class WavePreparer:
+    '''
+    Plans the next wave of a game ahead of time and pre-renders its letters, so starting a wave costs about as much
+    as any other frame.
+    
+    The plan is made on a worker thread; it is plain Python and touches nothing the game uses. Pre-rendering goes
+    through pygame fonts and the sprite cache, which are not thread-safe, so it runs on the game thread instead, a
+    little every frame within a time budget. The finished plan is handed to the game as state.next_wave, which
+    step() uses when the wave starts. Plans only depend on the seed, wave number and world size, so a game plays the same
+    whether or not its waves were prepared.
+    
+    Arguments:
+        budget_ms (float): Time per frame spent pre-rendering letters.
+    '''
+    def __init__(self, budget_ms=WAVE_WARM_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.executor = None # Worker thread, started on first use
+        self.future = None # Plan being made
+        self.planning = None # (seed, wave, world size) of the plan being made
+        self.pending = [] # (letter, size, angle) of letters still to pre-render
+        self.masks = None # Mask cache to warm as well when the game checks precise collisions
+    
+    def update(self, state):
+        '''
+        Moves the preparation of the game's next wave along. Call once per frame while the game is played.
+        
+        Arguments:
+            state (GameState): Game in progress.
+        '''
+        if self.pending:
+            self.warm()
+        wave = state.current_wave + 1
+        if state.next_wave is not None and state.next_wave.wave == wave:
+            return # Ready, or being warmed
+        key = (state.seed, wave, state.world_width, state.world_height)
+        if self.planning != key:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alphastroid-waves")
+            self.future = self.executor.submit(plan_wave, *key)
+            self.planning = key
+        elif self.future.done():
+            plan = self.future.result()
+            state.next_wave = plan
+            self.future = None
+            self.planning = None
+            self.masks = state.collision_masks
+            self.pending = [(letter, size, angle) for _, _, letter, size, angle, _ in plan.asteroids]
+            self.pending.reverse() # Warmed by popping from the end, in spawn order
+    
+    def warm(self):
+        '''
+        Pre-renders pending letters until the frame's time budget is used up.
+        '''
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        while self.pending and time.perf_counter() < deadline:
+            letter, size, angle = self.pending.pop()
+            sprite_cache.get(letter, size * viewport.scale, angle)
+            if self.masks is not None:
+                self.masks.get(letter, size, angle)
+    
+    def close(self):
+        '''
+        Stops the worker thread, dropping any plan still being made.
+        '''
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.future = None
+        self.planning = None
+        self.pending = []
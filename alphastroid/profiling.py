@@ -0,0 +1,164 @@
+'''
+Frame timing and profiler hooks.
+'''
+import math
+import time
+from collections import deque
+
+# Profiling
+class ProfilerHooks:
+    '''
+    Lets external profilers subscribe to frame and phase markers.
+    
+    Events:
+        'frame_begin': callback(frame_number)
+        'phase': callback(phase_name, elapsed_ms)
+        'frame_end': callback(frame_number, frame_ms)
+        'quality': callback(decision), with the decision dict of a QualityGovernor level change
+        'gc': callback(generation, pause_ms, collected), for every garbage collection while a MemoryMonitor runs
+    
+    The game only times frames while the debug overlay is visible or something is subscribed to the frame
+    markers, so hooks cost nothing when unused.
+    '''
+    TIMING_EVENTS = ('frame_begin', 'phase', 'frame_end')
+    EVENTS = TIMING_EVENTS + ('quality', 'gc')
+    
+    def __init__(self):
+        self.listeners = {event: [] for event in self.EVENTS}
+        self.active = False # True while at least one callback is subscribed to a frame marker
+    
+    def subscribe(self, event, callback):
+        '''
+        Registers a callback for an event.
+        
+        Arguments:
+            event (str): One of EVENTS.
+            callback (callable): Function called with the event's arguments.
+        '''
+        if event not in self.listeners:
+            raise ValueError(f"Unknown profiler event {event!r}, expected one of {self.EVENTS}")
+        self.listeners[event].append(callback)
+        self.active = any(self.listeners[event] for event in self.TIMING_EVENTS)
+    
+    def unsubscribe(self, event, callback):
+        '''
+        Removes a callback registered with subscribe().
+        
+        Arguments:
+            event (str): One of EVENTS.
+            callback (callable): The registered function.
+        '''
+        self.listeners[event].remove(callback)
+        self.active = any(self.listeners[event] for event in self.TIMING_EVENTS)
+    
+    def emit(self, event, *args):
+        '''
+        Calls every callback subscribed to an event.
+        
+        Arguments:
+            event (str): One of EVENTS.
+            *args: Arguments passed to the callbacks.
+        '''
+        for callback in self.listeners[event]:
+            callback(*args)
+
+profiler_hooks = ProfilerHooks() # Subscribe here to receive the window loop's frame and phase markers
+
+class FrameTimer:
+    '''
+    Measures how long a frame and each of its phases take.
+    
+    Call begin_frame() at the start of a frame, lap(phase) at the end of each phase, and end_frame() when the frame
+    is done. A phase that is lapped several times in one frame is summed. Times are kept in milliseconds.
+    
+    Arguments:
+        history (int or None): Number of recent frames to keep, or None to keep every frame.
+        hooks (ProfilerHooks or None): Receives frame and phase markers as they happen.
+    '''
+    def __init__(self, history=None, hooks=None):
+        self.history = history
+        self.hooks = hooks
+        self.frame_times = deque(maxlen=history) # Total time of each frame
+        self.phase_times = {} # Maps phase name to the time it took in each frame
+        self.current = {} # Phase times of the frame in progress
+        self.frame_start = 0
+        self.last_lap = 0
+        self.frames = 0
+    
+    def begin_frame(self):
+        '''
+        Starts timing a new frame.
+        '''
+        self.current.clear()
+        if self.hooks:
+            self.hooks.emit('frame_begin', self.frames)
+        self.frame_start = self.last_lap = time.perf_counter()
+    
+    def lap(self, phase):
+        '''
+        Ends a phase, charging the time since the previous lap (or the frame start) to it.
+        
+        Arguments:
+            phase (str): Name of the phase that just finished.
+        '''
+        now = time.perf_counter()
+        elapsed = (now - self.last_lap) * 1000
+        self.current[phase] = self.current.get(phase, 0) + elapsed
+        if self.hooks:
+            self.hooks.emit('phase', phase, elapsed)
+            now = time.perf_counter() # Don't charge the callbacks to the next phase
+        self.last_lap = now
+    
+    def end_frame(self):
+        '''
+        Stores the times of the frame in progress. Phases that did not run this frame are recorded as zero.
+        '''
+        frame_time = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_times.append(frame_time)
+        for phase, times in self.phase_times.items():
+            times.append(self.current.pop(phase, 0))
+        for phase, elapsed in self.current.items():
+            # First time this phase shows up, so it took no time in the earlier frames
+            self.phase_times[phase] = deque([0] * (len(self.frame_times) - 1) + [elapsed], maxlen=self.history)
+        if self.hooks:
+            self.hooks.emit('frame_end', self.frames, frame_time)
+        self.frames += 1
+    
+    def recent_phase_means(self):
+        '''
+        Returns the mean time of every phase over the kept frames.
+        
+        Returns:
+            dict: Maps phase name to its mean time in milliseconds.
+        '''
+        return {phase: sum(times) / len(times) for phase, times in self.phase_times.items() if times}
+    
+    def report(self):
+        '''
+        Summarizes the recorded frames.
+        
+        Returns:
+            dict: Mean, 95th and 99th percentile times in milliseconds for the whole frame and for every phase.
+        '''
+        return {
+            'frames': self.frames,
+            'frame': summarize_times(self.frame_times),
+            'phases': {phase: summarize_times(times) for phase, times in self.phase_times.items()}
+        }
+
+def summarize_times(times):
+    '''
+    Computes the mean and tail percentiles of a list of times.
+    
+    Arguments:
+        times (list): Times in milliseconds.
+    
+    Returns:
+        dict: 'mean', 'p95' and 'p99' in milliseconds, all zero if times is empty.
+    '''
+    if not times:
+        return {'mean': 0, 'p95': 0, 'p99': 0}
+    ordered = sorted(times)
+    def percentile(p):
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] # Nearest rank percentile
+    return {'mean': sum(ordered) / len(ordered), 'p95': percentile(95), 'p99': percentile(99)}
@@ -0,0 +1,111 @@
+'''
+Adaptive drawing quality that keeps frames within the frame budget.
+
+Only drawing is affected. The simulation, collisions and recordings are the same at every quality level.
+'''
+import time
+from collections import deque
+
+from .config import QUALITY_LEVELS, QUALITY_WINDOW, QUALITY_HEADROOM, QUALITY_RAISE_DELAY, FRAME_BUDGET_MS
+from .caches import sprite_cache
+from .hud import hud_layer
+from .render import starfield, debris_renderer
+
+def apply_quality(level):
+    '''
+    Sets the drawing quality of the shared renderers.
+    
+    Arguments:
+        level (int): Index into QUALITY_LEVELS, 0 being the best quality.
+    '''
+    star_density, angle_step, fragment_detail, hud_interval = QUALITY_LEVELS[level]
+    starfield.set_density(star_density)
+    sprite_cache.set_angle_step(angle_step)
+    debris_renderer.detail = fragment_detail
+    hud_layer.update_interval = hud_interval
+
+class QualityGovernor:
+    '''
+    Lowers the drawing quality one level at a time while frames take longer than the budget, and raises it
+    again once there is headroom.
+    
+    Frame times are averaged over the last QUALITY_WINDOW frames. Quality is lowered as soon as a full window
+    averages over the budget, and raised when a full window averages under QUALITY_HEADROOM of it and the level
+    has not changed for QUALITY_RAISE_DELAY frames, so a level that barely fits is not toggled back and forth.
+    Every change is kept in decisions and sent to the hooks as a 'quality' event.
+    
+    Arguments:
+        budget_ms (float): Time available per frame in milliseconds.
+        hooks (ProfilerHooks or None): Receives a 'quality' event on every change.
+        history (int): Number of recent decisions to keep.
+    '''
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, hooks=None, history=32):
+        self.budget_ms = budget_ms
+        self.hooks = hooks
+        self.level = 0
+        self.frame_times = deque(maxlen=QUALITY_WINDOW) # Work time of the recent frames
+        self.total = 0 # Sum of frame_times
+        self.frames = 0
+        self.last_change = 0 # Frame of the last level change
+        self.decisions = deque(maxlen=history) # Most recent level changes, oldest first
+        apply_quality(self.level)
+    
+    def update(self, frame_ms):
+        '''
+        Adds the time one frame took and changes the quality level if needed.
+        
+        Arguments:
+            frame_ms (float): Time spent on the frame in milliseconds, not counting the wait for the frame rate.
+        
+        Returns:
+            bool: True if the level changed.
+        '''
+        if len(self.frame_times) == self.frame_times.maxlen:
+            self.total -= self.frame_times[0]
+        self.frame_times.append(frame_ms)
+        self.total += frame_ms
+        self.frames += 1
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return False
+        
+        mean = self.total / len(self.frame_times)
+        if mean > self.budget_ms and self.level < len(QUALITY_LEVELS) - 1:
+            self.set_level(self.level + 1, mean, "over budget")
+            return True
+        if (mean < self.budget_ms * QUALITY_HEADROOM and self.level > 0
+                and self.frames - self.last_change >= QUALITY_RAISE_DELAY):
+            self.set_level(self.level - 1, mean, "headroom")
+            return True
+        return False
+    
+    def set_level(self, level, mean_ms=0, reason="manual"):
+        '''
+        Switches to a quality level and records the decision.
+        
+        Arguments:
+            level (int): Index into QUALITY_LEVELS.
+            mean_ms (float): Average frame time that led to the change.
+            reason (str): Why the level changed.
+        '''
+        decision = {'time': time.perf_counter(), 'frame': self.frames, 'from': self.level, 'to': level,
+                    'mean_ms': mean_ms, 'reason': reason}
+        self.level = level
+        self.last_change = self.frames
+        # The new level is judged on its own frames only
+        self.frame_times.clear()
+        self.total = 0
+        apply_quality(level)
+        self.decisions.append(decision)
+        if self.hooks:
+            self.hooks.emit('quality', decision)
+    
+    def settings(self):
+        '''
+        Returns what the current level draws with.
+        
+        Returns:
+            dict: 'level', 'star_density', 'angle_step', 'fragment_detail' and 'hud_interval'.
+        '''
+        star_density, angle_step, fragment_detail, hud_interval = QUALITY_LEVELS[self.level]
+        return {'level': self.level, 'star_density': star_density, 'angle_step': angle_step,
+                'fragment_detail': fragment_detail, 'hud_interval': hud_interval}
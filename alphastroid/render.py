@@ -0,0 +1,779 @@
+'''
+Drawing of the ship, asteroids, bullets, debris, stars and whole screens.
+'''
+import time
+import pygame
+
+from .config import WIDTH, HEIGHT, STAR_LAYER_SPEEDS, STAR_TWINKLE_GROUPS, CULL_MARGIN
+from .assets import get_nebula_layer, get_wasd_and_arrow_keys, get_spacebar_key
+from .caches import sprite_cache
+from .entities import star_layer
+from .hud import (title_label, start_prompt_label, gameover_label, playagain_label, instruction_label,
+                  hud_layer)
+from .viewport import viewport
+
+BULLET_RADIUS = 3
+FAST_BLITS = hasattr(pygame.Surface, 'fblits') # pygame-ce's blits() variant that returns nothing
+
+# Batched drawing
+class RenderQueue:
+    '''
+    Collects the sprites of one layer and draws them all with a single Surface.blits() call, which saves the
+    Python and SDL overhead of a blit() call per sprite. Surface.fblits() is used instead where pygame has it
+    and the drawn areas are not needed.
+    '''
+    def __init__(self):
+        self.items = [] # (sprite, position) pairs waiting to be drawn, reused every frame
+    
+    def add(self, sprite, position):
+        '''
+        Queues a sprite.
+        
+        Arguments:
+            sprite (pygame.Surface): Surface to draw.
+            position (tuple): Top left corner to draw it at.
+        '''
+        self.items.append((sprite, position))
+    
+    def flush(self, surface, collect=True):
+        '''
+        Draws every queued sprite in order and empties the queue.
+        
+        Arguments:
+            surface: Pygame surface to draw on.
+            collect (bool): Whether the drawn areas are needed. Skipping them saves creating a Rect per sprite.
+        
+        Returns:
+            list: Area drawn on for each sprite, or nothing if collect is False.
+        '''
+        if not self.items:
+            return []
+        if collect:
+            rects = surface.blits(self.items)
+        elif FAST_BLITS:
+            surface.fblits(self.items)
+            rects = []
+        else:
+            surface.blits(self.items, False)
+            rects = []
+        self.items.clear()
+        return rects
+
+render_queue = RenderQueue() # Shared by the draw functions, each of which flushes it before returning
+
+dot_sprites = {} # Pre-rendered round dots by (color, radius), built on first use
+
+def get_dot(color, radius):
+    '''
+    Returns a filled circle sprite, so dots are blitted like every other sprite instead of drawn one by one.
+    
+    Arguments:
+        color (tuple): RGB color of the dot.
+        radius (int): Radius in pixels.
+    
+    Returns:
+        pygame.Surface: Square sprite 2 * radius + 1 pixels wide with a transparent color key.
+    '''
+    dot = dot_sprites.get((color, radius))
+    if dot is None:
+        dot = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+        pygame.draw.circle(dot, color, (radius, radius), radius)
+        if pygame.display.get_surface() is not None:
+            dot = dot.convert() # Match the display's pixel format
+        dot.set_colorkey((0, 0, 0), pygame.RLEACCEL) # Black is transparent
+        dot_sprites[(color, radius)] = dot
+    return dot
+
+def interpolate(previous, current, alpha, period=None):
+    '''
+    Blends a value from before the last simulation step towards its current value, for drawing in between steps.
+    
+    Arguments:
+        previous (float): Value before the last step.
+        current (float): Value after the last step.
+        alpha (float): How far the drawn frame is between the two steps, from 0 to 1.
+        period (float or None): For values that wrap around (screen positions, angles), the wrap length, so a
+            value that just wrapped moves the short way instead of sweeping across the whole range.
+    
+    Returns:
+        float: The blended value.
+    '''
+    delta = current - previous
+    if period is None:
+        return previous + delta * alpha
+    delta = (delta + period / 2) % period - period / 2 # Shortest way around
+    return (previous + delta * alpha) % period
+
+class Camera:
+    '''
+    The playfield sized part of a game's world that is drawn.
+    
+    In a world the size of the playfield the view is the whole world and positions are drawn as they are. In a
+    larger world the view is centered on the ship, and positions are wrapped to whichever side of the view they
+    are nearest. Either way, the draw functions skip everything to_screen() reports as out of view, and
+    draw_asteroids() skips the asteroids the simulation marked as far without even asking, so drawing costs about
+    as much as what is on screen however many asteroids the world holds.
+    '''
+    def __init__(self):
+        self.x = 0 # World position of the view's top left corner
+        self.y = 0
+        self.world_width = WIDTH
+        self.world_height = HEIGHT
+        self.scrolling = False # Whether the view follows the ship
+    
+    def follow(self, state, alpha=1):
+        '''
+        Moves the view to a game's ship as it is drawn this frame.
+        
+        Arguments:
+            state (GameState): Game about to be drawn.
+            alpha (float): Position between the previous and the last simulation step the game is drawn at.
+        '''
+        self.world_width, self.world_height = state.world_width, state.world_height
+        self.scrolling = state.scrolling
+        if self.scrolling:
+            self.x = interpolate(state.prev_ship_pos[0], state.ship_pos[0], alpha, self.world_width) - WIDTH / 2
+            self.y = interpolate(state.prev_ship_pos[1], state.ship_pos[1], alpha, self.world_height) - HEIGHT / 2
+        else:
+            self.x = self.y = 0
+    
+    def to_screen(self, x, y, radius=0):
+        '''
+        Converts a world position to the playfield position it is drawn at, unless it is out of view.
+        
+        Arguments:
+            x, y (float): World position.
+            radius (float): How far the object drawn there reaches from its position.
+        
+        Returns:
+            tuple or None: (x, y) on the playfield, or None if the object lies more than CULL_MARGIN outside the view.
+        '''
+        reach = radius + CULL_MARGIN
+        if self.scrolling:
+            x = (x - self.x) % self.world_width
+            y = (y - self.y) % self.world_height
+            if x > WIDTH + reach:
+                x -= self.world_width # Left of the view rather than far right of it
+            if y > HEIGHT + reach:
+                y -= self.world_height
+        if -reach < x < WIDTH + reach and -reach < y < HEIGHT + reach:
+            return x, y
+        return None
+
+camera = Camera() # View of the game being drawn, moved by draw_game
+
+# Ship related functions
+def draw_ship(surface, state, alpha=1, collect=True):
+    '''
+    Draws the ship on the screen with optional thrust effect.
+    
+    The ship's sprite goes through the render queue like every other sprite; the flames are lines drawn on top.
+    
+    Arguments:
+        surface: Pygame surface to draw the ship.
+        state (GameState): Game whose ship is drawn.
+        alpha (float): Position between the previous and the last simulation step to draw the ship at.
+        collect (bool): Whether to return the drawn area.
+    
+    Returns:
+        list: Area drawn on by the ship and its flames, or nothing if the ship is hidden or collect is False.
+    '''
+    scale = viewport.scale
+    position = camera.to_screen(interpolate(state.prev_ship_pos[0], state.ship_pos[0], alpha, camera.world_width),
+                                interpolate(state.prev_ship_pos[1], state.ship_pos[1], alpha, camera.world_height))
+    angle = interpolate(state.prev_ship_angle, state.ship_angle, alpha)
+    if position is not None and state.ship_alive and (not state.invincible or int(time.perf_counter() * 1000 / 150) % 2 == 0): # Create glitchy flicker effect when invincible using modulo
+        rotated_text = sprite_cache.get("A", 30 * scale, angle, (200, 200, 200)) # The ship is the letter "A", pre-rotated from the sprite cache
+        position = (position[0] * scale, position[1] * scale)
+        text_rect = rotated_text.get_rect(center = position) # Draw the ship to the screen
+        render_queue.add(rotated_text, text_rect.topleft)
+        rects = render_queue.flush(surface, collect)
+        
+        if state.thrusting:
+            # If the ship is thrusting draw flame effects
+            position = pygame.Vector2(position) # Convert position to Vector2 for vector math
+            # Define the rear corners and the tip of the thrust flame relative to the ship 
+            rear_left = position + pygame.Vector2(-5, 10).rotate(angle) * scale # Rear left point after rotation
+            rear_right = position + pygame.Vector2(5, 10).rotate(angle) * scale # Rear right point after rotation
+            thrust_tip = position + pygame.Vector2(0, 20).rotate(angle) * scale # Tip of the thrust flame
+            # Draw two flame lines simulating thrust from each rear corner to the tip
+            width = viewport.pixels(2)
+            left_flame = pygame.draw.line(surface, (255, 100, 0), rear_left, thrust_tip, width) # Left flame
+            right_flame = pygame.draw.line(surface, (255, 100, 0), rear_right, thrust_tip, width) # Right flame
+            if collect:
+                rects += [left_flame, right_flame]
+        return rects
+    return []
+
+def depict_fragments(surface, fragments, collect=True):
+    '''
+    Draws the ship fragments with their fading transparency.
+    
+    Arguments:
+        surface: Pygame surface to draw on.
+        fragments (list): Fragment dictionaries to draw.
+        collect (bool): Whether to return the drawn area.
+    
+    Returns:
+        list: Area drawn on, or nothing if no fragments are in view or collect is False.
+    '''
+    return debris_renderer.draw(surface, fragments, collect=collect) # Draw every fragment in one batch
+
+class DebrisRenderer:
+    '''
+    Draws fading debris lines for all live fragments into one reused transparent overlay.
+    
+    Instead of allocating a full screen SRCALPHA surface per fragment per frame, every line is drawn into
+    the same overlay, only the area touched last frame is cleared, and only the area touched this frame is
+    blitted through the render queue, so the cost grows with the size of the debris rather than the size of the
+    screen.
+    
+    At lower detail the overlay is skipped and the lines are drawn straight onto the surface, fading to black
+    instead of to the background. The overlay has the size of the viewport; fragments out of the camera's view
+    are skipped.
+    '''
+    def __init__(self):
+        self.overlay = None # Transparent surface reused every frame, created on first use
+        self.dirty_rect = None # Area of the overlay drawn on last frame
+        self.detail = 2 # 2 for translucent lines, 1 for opaque lines, 0 for opaque thin lines
+    
+    def draw(self, surface, fragments, line_width=3, collect=True):
+        '''
+        Draws every fragment as a line whose alpha is its transparency.
+        
+        Arguments:
+            surface: Pygame surface to draw the debris on.
+            fragments (list): Fragment dictionaries with 'start', 'end' and 'transparency'.
+            line_width (int): Width of each debris line in playfield pixels.
+            collect (bool): Whether to return the drawn area.
+        
+        Returns:
+            list: Screen area that was drawn on, or nothing if nothing was in view or collect is False.
+        '''
+        if self.overlay is None or self.overlay.get_size() != viewport.size:
+            self.overlay = pygame.Surface(viewport.size, pygame.SRCALPHA)
+            self.dirty_rect = None
+        
+        # Clear what was drawn last frame
+        if self.dirty_rect is not None:
+            self.overlay.fill((0, 0, 0, 0), self.dirty_rect)
+            self.dirty_rect = None
+        if not fragments:
+            return []
+        
+        scale = viewport.scale
+        lines = [] # (start, end, fragment) of the fragments in view, in render pixels
+        for fragment in fragments:
+            start, end = fragment['start'], fragment['end']
+            position = camera.to_screen(start[0], start[1])
+            if position is not None:
+                # The end is placed relative to the start, so a line crossing the world's edge stays in one piece
+                lines.append(((int(position[0] * scale), int(position[1] * scale)),
+                              (int((position[0] + end[0] - start[0]) * scale), int((position[1] + end[1] - start[1]) * scale)),
+                              fragment))
+        if not lines:
+            return []
+        
+        if self.detail < 2:
+            rects = []
+            for start, end, fragment in lines:
+                shade = max(0, int(fragment['transparency']))
+                rects.append(pygame.draw.line(surface, (shade, shade, shade), start, end,
+                                              viewport.pixels(line_width if self.detail else 1)))
+            return [rects[0].unionall(rects[1:])] if collect else []
+        
+        rects = []
+        line_width = viewport.pixels(line_width)
+        for start, end, fragment in lines:
+            # Calculate current alpha value making sure its non-negative
+            alpha = max(0, int(fragment['transparency']))
+            rects.append(pygame.draw.line(self.overlay, (255, 255, 255, alpha), start, end, line_width))
+        
+        # Blit only the part of the overlay that holds debris
+        self.dirty_rect = rects[0].unionall(rects[1:]).clip(self.overlay.get_rect())
+        if not self.dirty_rect:
+            # Fragments are drawn up to CULL_MARGIN outside the view, where every line can miss the overlay
+            self.dirty_rect = None
+            return []
+        render_queue.add(self.overlay.subsurface(self.dirty_rect), self.dirty_rect.topleft)
+        return render_queue.flush(surface, collect)
+
+debris_renderer = DebrisRenderer() # Shared overlay for ship debris
+
+# Asteroid functions
+def draw_asteroids(surface, asteroids, alpha=1, collect=True):
+    '''
+    Draws every asteroid in the camera's view as its letter, all in one batch.
+    
+    Arguments:
+        surface: Pygame surface to draw the asteroids on.
+        asteroids (iterable): Asteroids to draw, usually the game's Pool.
+        alpha (float): Position between the previous and the last simulation step to draw the asteroids at.
+        collect (bool): Whether to return the drawn areas.
+    
+    Returns:
+        list: Area drawn on for each asteroid, or nothing if collect is False.
+    '''
+    scale = viewport.scale
+    to_screen = camera.to_screen
+    world_width, world_height = camera.world_width, camera.world_height
+    for asteroid in asteroids:
+        if asteroid.far:
+            continue # More than a playfield from the ship, the simulation already found it out of view
+        position = to_screen(interpolate(asteroid.prev_x, asteroid.x, alpha, world_width),
+                             interpolate(asteroid.prev_y, asteroid.y, alpha, world_height), asteroid.size / 2)
+        if position is None:
+            continue # Out of view
+        # Fetch the letter already rendered at the asteroid's size and rotated to its angle to simulate spinning
+        rotated_text = sprite_cache.get(asteroid.letter, asteroid.size * scale,
+                                        interpolate(asteroid.prev_angle, asteroid.angle, alpha, 360))
+        # Center the rotated text on the asteroid's position
+        x = int(position[0] * scale)
+        y = int(position[1] * scale)
+        render_queue.add(rotated_text, (x - rotated_text.get_width() // 2, y - rotated_text.get_height() // 2))
+    return render_queue.flush(surface, collect)
+
+# Bullet functions
+def draw_bullets(surface, bullets, alpha=1, collect=True):
+    '''
+    Draws all active bullets in the camera's view as small yellow dots, all in one batch.
+    
+    Arguments:
+        surface: Pygame surface to draw bullets on.
+        bullets (Pool): Bullets to draw.
+        alpha (float): Position between the previous and the last simulation step to draw the bullets at.
+        collect (bool): Whether to return the drawn areas.
+    
+    Returns:
+        list: Area drawn on for each bullet, or nothing if collect is False.
+    '''
+    scale = viewport.scale
+    radius = viewport.pixels(BULLET_RADIUS)
+    dot = get_dot((255, 255, 100), radius)
+    to_screen = camera.to_screen
+    # Bullets only wrap around the edges of a world larger than the playfield, otherwise they are blended without a period
+    period_x, period_y = (camera.world_width, camera.world_height) if camera.scrolling else (None, None)
+    for bullet in bullets:
+        position = to_screen(interpolate(bullet.prev_x, bullet.x, alpha, period_x),
+                             interpolate(bullet.prev_y, bullet.y, alpha, period_y), BULLET_RADIUS)
+        if position is not None:
+            render_queue.add(dot, (int(position[0] * scale) - radius, int(position[1] * scale) - radius))
+    return render_queue.flush(surface, collect)
+
+# Star functions
+class Starfield:
+    '''
+    Draws the stars as a few pre-rendered depth layers that scroll with wrap-around blits.
+    
+    Every layer is split into twinkle groups. Each group is a screen-sized surface holding its stars as white dots,
+    with a transparent color key and RLE acceleration so the empty space costs almost nothing to blit. Twinkling
+    changes a group's surface alpha instead of redrawing stars, so the cost per frame depends on the number of
+    layers and groups, not on the number of stars.
+    
+    Tiling the layers covers the whole screen every frame, which would make a dirty-rect pass restore and present
+    all of it. When the drawn areas are collected, the stars are therefore drawn one dot sprite each instead,
+    twinkling with their group, so only the areas around the stars are reported.
+    
+    Arguments:
+        groups (int): Number of twinkle groups per layer.
+    '''
+    def __init__(self, groups=STAR_TWINKLE_GROUPS):
+        self.groups = groups
+        self.density = 1.0 # Fraction of the stars and twinkle groups drawn
+        self.stars = None # Star list the layers were rendered from
+        self.size = None # Viewport size the layers were rendered at
+        self.layers = [] # For each layer, a list of (surface, [brightness, twinkle_speed], dot) per twinkle group
+        self.dots = [] # (x, y, layer, dot) of the center of every drawn star, at the render resolution
+    
+    def set_density(self, density):
+        '''
+        Changes the fraction of stars drawn. Fewer stars are drawn in fewer twinkle groups, which saves blits.
+        
+        Arguments:
+            density (float): Fraction of the stars to draw, from 0 to 1.
+        '''
+        if density != self.density:
+            self.density = density
+            self.stars = None # Rebuild the layers on the next draw
+    
+    def build(self, stars):
+        '''
+        Renders the layer surfaces for a list of stars.
+        
+        Arguments:
+            stars (list): Stars as created by init_stars.
+        '''
+        self.stars = stars
+        self.star_count = len(stars)
+        self.size = viewport.size
+        scale = viewport.scale
+        radius = viewport.pixels(1)
+        groups = max(1, round(self.groups * self.density))
+        self.layers = [[None] * groups for _ in STAR_LAYER_SPEEDS]
+        self.dots = []
+        convert = pygame.display.get_surface() is not None # Match the display's pixel format when there is one
+        for index, star in enumerate(stars[:round(len(stars) * self.density)]):
+            layer_index = star_layer(star[4])
+            layer = self.layers[layer_index]
+            group = index % groups
+            if layer[group] is None:
+                # The group twinkles like its first star did, and has its own dot sprite to twinkle with it
+                surface = pygame.Surface(self.size)
+                dot = get_dot((255, 255, 255), radius).copy()
+                dot.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+                layer[group] = (surface, [star[2], star[3]], dot)
+            x, y = int(star[0] * scale), int(star[1] * scale)
+            pygame.draw.circle(layer[group][0], (255, 255, 255), (x, y), radius)
+            self.dots.append((x, y, layer_index, layer[group][2]))
+        
+        for layer in self.layers:
+            for group, entry in enumerate(layer):
+                if entry is not None:
+                    surface = entry[0].convert() if convert else entry[0]
+                    surface.set_colorkey((0, 0, 0), pygame.RLEACCEL) # Black is transparent
+                    layer[group] = (surface, entry[1], entry[2])
+            layer[:] = [entry for entry in layer if entry is not None] # Drop groups without stars
+    
+    def draw(self, surface, stars, offsets, collect=True):
+        '''
+        Twinkles and draws every layer at its scroll offset, all in one batch.
+        
+        Arguments:
+            surface: Pygame surface to draw the stars on.
+            stars (list): Stars as created by init_stars; layers are rebuilt when this changes.
+            offsets (list): Scroll offset [x, y] of each layer in playfield pixels.
+            collect (bool): Whether to return the drawn area.
+        
+        Returns:
+            list: The area around every star, or nothing if collect is False.
+        '''
+        if stars is not self.stars or len(stars) != self.star_count or self.size != viewport.size:
+            self.build(stars)
+        
+        width, height = self.size
+        scaled_offsets = []
+        for layer, (offset_x, offset_y) in zip(self.layers, offsets):
+            offset_x = int(offset_x * viewport.scale)
+            offset_y = int(offset_y * viewport.scale)
+            scaled_offsets.append((offset_x, offset_y))
+            for layer_surface, twinkle, dot in layer:
+                # Update group brightness on twinkle speed, reversing direction at the limits
+                twinkle[0] += twinkle[1]
+                if twinkle[0] > 255:
+                    twinkle[0] = 255
+                    twinkle[1] *= -1
+                elif twinkle[0] < 100:
+                    twinkle[0] = 100
+                    twinkle[1] *= -1
+                if collect:
+                    dot.set_alpha(int(twinkle[0]), pygame.RLEACCEL)
+                    continue
+                layer_surface.set_alpha(int(twinkle[0]), pygame.RLEACCEL)
+                
+                # Four blits tile the screen with the layer wrapped around at the offset
+                render_queue.add(layer_surface, (offset_x, offset_y))
+                render_queue.add(layer_surface, (offset_x - width, offset_y))
+                render_queue.add(layer_surface, (offset_x, offset_y - height))
+                render_queue.add(layer_surface, (offset_x - width, offset_y - height))
+        if collect:
+            radius = viewport.pixels(1)
+            for x, y, layer_index, dot in self.dots:
+                offset_x, offset_y = scaled_offsets[layer_index]
+                render_queue.add(dot, ((x + offset_x) % width - radius, (y + offset_y) % height - radius))
+        return render_queue.flush(surface, collect)
+
+starfield = Starfield() # Shared star layers for the menu and game screens
+
+def draw_stars(surface, state, alpha=1, collect=True):
+    '''
+    Draws the twinkling parallax starfield of a game.
+    
+    Arguments:
+        surface: Pygame surface to draw the stars on.
+        state (GameState): Game whose stars and layer offsets are drawn.
+        alpha (float): Position between the previous and the last simulation step to draw the layers at.
+        collect (bool): Whether to return the drawn areas.
+    
+    Returns:
+        list: Areas drawn on, or nothing if collect is False.
+    '''
+    offsets = [(interpolate(previous[0], offset[0], alpha, WIDTH), interpolate(previous[1], offset[1], alpha, HEIGHT))
+               for previous, offset in zip(state.prev_star_offsets, state.star_offsets)]
+    return starfield.draw(surface, state.stars, offsets, collect)
+
+# Screens
+def draw_main_menu(surface, state):
+    '''
+    Renders the main menu screen with a background, twinkling stars, the game title, and
+    a prompt to start the game.
+    
+    Arguments:
+        surface: Pygame surface to draw the menu on.
+        state (GameState): Game whose stars are drawn behind the title.
+    '''
+    
+    surface.blit(get_nebula_layer(), (0, 0)) # Draw the nebula background image
+    draw_stars(surface, state, collect=False) # Draw animated stars on top of the background
+    
+    title_text = title_label.render("ALPHASTROID") # Game title text, rendered once
+    prompt_text = start_prompt_label.render("Press SPACE to Start") # Prompt title text, rendered once
+    width, height, scale = viewport.width, viewport.height, viewport.scale
+    title_rect = title_text.get_rect(center=(width / 2, height / 2 - 40 * scale)) # Center game title on screen
+    prompt_rect = prompt_text.get_rect(center=(width / 2, height / 2 + 40 * scale)) # Center prompt text on screen
+    surface.blit(title_text, title_rect) # Draw the title on the surface
+    surface.blit(prompt_text, prompt_rect) # Draw the prompt on the surface
+
+def draw_GAMEOVER(surface):
+    '''
+    Displays the "Game Over" screen with a rede title and a prompt to restart the game.
+    
+    Arguments:
+        surface: Pygame surface to draw the game over message on.
+    '''
+    gameover_text = gameover_label.render("GAME OVER") # Game over text, rendered once
+    gameover_rect = gameover_text.get_rect(center=(viewport.width / 2, viewport.height / 2)) # Centering Game over text
+    
+    playagain_text = playagain_label.render("Press SPACE to return to Main Menu") # Play again text, rendered once
+    playagain_rect = playagain_text.get_rect(center=(viewport.width / 2, viewport.height / 2 + 40 * viewport.scale)) # Centering play again text
+
+    surface.blit(gameover_text, gameover_rect) # Draw game over message on surface
+    surface.blit(playagain_text, playagain_rect) # Draw play again message on surface
+
+def draw_instructions(surface):
+    '''
+    Displays instructions based on how to move and shoot.
+    
+    Arguments:
+        surface: Pygame surface to draw the instructions on
+    '''
+    instruction_text = instruction_label.render("Use WASD or Arrow Keys to move. Use Spacebar to shoot") # Instructions text, rendered once
+    scale = viewport.scale
+    instruction_text_rect = instruction_text.get_rect(center=(viewport.width / 2, viewport.height - 25 * scale)) # Positioning instruction text
+    surface.blit(instruction_text, instruction_text_rect) # Draw instruction text on surface
+    
+    surface.blit(get_wasd_and_arrow_keys(), (0, int(225 * scale))) # Draw wasdandarrowkeys image on surface
+    surface.blit(get_spacebar_key(), (int(400 * scale), int(245 * scale))) # Draw spacebarkey image on surface
+
+# Rendering
+class DirtyRectRenderer:
+    '''
+    Redraws and presents only the parts of the screen that changed since the last frame.
+    
+    Each frame, the areas drawn on last frame are restored from the background, everything is drawn again,
+    and only the old and new areas are passed to pygame.display.update(). The whole screen is redrawn and
+    presented when the background changes or after invalidate().
+    '''
+    def __init__(self):
+        self.background = None # Background the screen was last fully drawn with
+        self.previous = [] # Areas drawn on last frame
+        self.full_redraw = True
+    
+    def invalidate(self):
+        '''
+        Forces the next frame to redraw and present the whole screen, e.g. after another screen was shown.
+        '''
+        self.full_redraw = True
+    
+    def restore(self, surface, background):
+        '''
+        Erases last frame's drawing by copying the background over the areas it covered.
+        
+        Arguments:
+            surface: Pygame surface being drawn on.
+            background: Surface holding the clean background.
+        '''
+        if self.full_redraw or background is not self.background:
+            self.background = background
+            self.full_redraw = True
+            surface.blit(background, (0, 0))
+        else:
+            for rect in self.previous:
+                surface.blit(background, rect, rect)
+    
+    def present(self, rects, display=None):
+        '''
+        Shows the frame, updating only the areas drawn on this frame and last frame.
+        
+        Arguments:
+            rects (list): Areas drawn on this frame.
+            display (Display or None): Display the frame is drawn for, which maps the areas to the window.
+        '''
+        update = display.update if display is not None else pygame.display.update
+        if self.full_redraw:
+            update()
+            self.full_redraw = False
+        else:
+            update(self.previous + rects)
+        self.previous = rects
+
+class Display:
+    '''
+    The window and the surface the game is drawn on.
+    
+    When the window has the viewport's size the game is drawn straight into it. Otherwise it is drawn into an
+    offscreen surface of the viewport's size, and present() scales that to the window with one transform call,
+    so drawing costs follow the render resolution rather than the window size. The picture keeps its aspect
+    ratio, centered between black bars if the window's shape differs.
+    
+    Arguments:
+        window (pygame.Surface): The display surface.
+        smooth (bool): Scale with smoothscale() instead of scale(), softer but slower.
+    '''
+    def __init__(self, window, smooth=False):
+        self.window = window
+        self.smooth = smooth
+        window_width, window_height = window.get_size()
+        if (window_width, window_height) == viewport.size:
+            self.surface = window
+            self.target = None
+            return
+        self.surface = pygame.Surface(viewport.size).convert(window)
+        factor = min(window_width / viewport.width, window_height / viewport.height)
+        target = pygame.Rect(0, 0, round(viewport.width * factor), round(viewport.height * factor))
+        target.center = (window_width // 2, window_height // 2)
+        self.target = window.subsurface(target) # Scaling writes straight into this part of the window
+        self.factor = factor
+        # The bars either side of the picture, cleared every frame in case the performance overlay covered them
+        self.bars = [rect for rect in (pygame.Rect(0, 0, target.left, window_height),
+                                       pygame.Rect(target.right, 0, window_width - target.right, window_height),
+                                       pygame.Rect(0, 0, window_width, target.top),
+                                       pygame.Rect(0, target.bottom, window_width, window_height - target.bottom))
+                     if rect.width > 0 and rect.height > 0]
+    
+    def present(self):
+        '''
+        Copies the drawn frame to the window, scaling it if it was drawn offscreen.
+        '''
+        if self.target is None:
+            return
+        for bar in self.bars:
+            self.window.fill((0, 0, 0), bar)
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, self.target.get_size(), self.target)
+        else:
+            pygame.transform.scale(self.surface, self.target.get_size(), self.target)
+    
+    def to_window(self, rect):
+        '''
+        Maps an area of the drawn frame to the window, rounding outwards so scaled edges are covered.
+        
+        Arguments:
+            rect (pygame.Rect): Area of the drawn frame.
+        
+        Returns:
+            pygame.Rect: The same area in the window.
+        '''
+        if self.target is None:
+            return rect
+        offset_x, offset_y = self.target.get_abs_offset()
+        left = int(rect.left * self.factor) + offset_x
+        top = int(rect.top * self.factor) + offset_y
+        return pygame.Rect(left, top, int(rect.right * self.factor) + offset_x + 2 - left,
+                           int(rect.bottom * self.factor) + offset_y + 2 - top)
+    
+    def from_window(self, rect):
+        '''
+        Maps an area of the window to the drawn frame, rounding outwards.
+        
+        Arguments:
+            rect (pygame.Rect): Area of the window.
+        
+        Returns:
+            pygame.Rect: The area of the drawn frame that covers it.
+        '''
+        if self.target is None:
+            return rect
+        offset_x, offset_y = self.target.get_abs_offset()
+        left = int((rect.left - offset_x) / self.factor)
+        top = int((rect.top - offset_y) / self.factor)
+        return pygame.Rect(left, top, int((rect.right - offset_x) / self.factor) + 2 - left,
+                           int((rect.bottom - offset_y) / self.factor) + 2 - top)
+    
+    def update(self, rects=None):
+        '''
+        Shows the window, or only some areas of the drawn frame.
+        
+        Arguments:
+            rects (list or None): Areas of the drawn frame to show, or None for the whole window.
+        '''
+        if rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update([self.to_window(rect) for rect in rects])
+
+game_backgrounds = {} # Background of the game screen by (instructions shown, viewport size), built on first use
+
+def get_game_background(show_instructions):
+    '''
+    Returns the background of the game screen, which includes the instructions while they are shown.
+    
+    Arguments:
+        show_instructions (bool): Whether the instructions overlay is part of the background.
+    
+    Returns:
+        pygame.Surface: The background surface.
+    '''
+    key = (show_instructions, viewport.size)
+    background = game_backgrounds.get(key)
+    if background is None:
+        background = get_nebula_layer()
+        if show_instructions:
+            # Compose in the same pixel format as the screen so it looks exactly like drawing both every frame
+            background = pygame.Surface(background.get_size())
+            background.blit(get_nebula_layer(), (0, 0))
+            draw_instructions(background)
+        game_backgrounds[key] = background
+    return background
+
+def draw_game(surface, state, timer=None, dirty=None, alpha=1):
+    '''
+    Draws one frame of a game in progress. Every sprite goes through the render queue: stars, asteroids and
+    bullets are each drawn in one batch, and the ship, debris overlay and HUD layer each in one blit.
+    
+    Arguments:
+        surface: Pygame surface to draw on.
+        state (GameState): Game to draw.
+        timer (FrameTimer or None): Receives a lap after each draw function when given.
+        dirty (DirtyRectRenderer or None): When given, only last frame's areas are cleared instead of the whole screen.
+        alpha (float): How far the frame is between the previous and the last simulation step, for interpolation.
+    
+    Returns:
+        list: Areas drawn on, not counting the background, when drawing with dirty rects. Otherwise nothing is
+        collected and the list is empty.
+    '''
+    collect = dirty is not None
+    camera.follow(state, alpha)
+    if dirty is not None:
+        dirty.restore(surface, get_game_background(state.first_time_instructions_overlay))
+        if timer:
+            timer.lap("draw_background")
+    else:
+        surface.blit(get_nebula_layer(), (0, 0)) # Draw nebula space background
+        if timer:
+            timer.lap("draw_background")
+        if state.first_time_instructions_overlay:
+            draw_instructions(surface) # Draw instructions
+            if timer:
+                timer.lap("draw_instructions")
+    rects = draw_stars(surface, state, alpha, collect) # Dra dynamic parallax stars on top of background
+    if timer:
+        timer.lap("draw_stars")
+    rects.extend(draw_ship(surface, state, alpha, collect)) # Draw the player ship
+    if timer:
+        timer.lap("draw_ship")
+    # The entity store hands over only the asteroids near the ship, without touching the far ones one by one
+    asteroids = state.entity_store.near_asteroids() if state.entity_store is not None else state.asteroids
+    rects.extend(draw_asteroids(surface, asteroids, alpha, collect)) # Draw all asteroids currently on screen
+    if timer:
+        timer.lap("draw_asteroids")
+    rects.extend(depict_fragments(surface, state.ship_fragments, collect)) # Draw debris fragments from destroyed ship
+    if timer:
+        timer.lap("depict_fragments")
+    rects.extend(draw_bullets(surface, state.bullets, alpha, collect)) # Draw all bullets
+    if timer:
+        timer.lap("draw_bullets")
+    render_queue.add(*hud_layer.compose(state.score, state.current_wave, state.lives)) # Draw score, lives and wave number
+    rects.extend(render_queue.flush(surface, collect))
+    if timer:
+        timer.lap("draw_hud")
+    return rects
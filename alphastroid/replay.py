@@ -0,0 +1,294 @@
+'''
+Recording and replaying games.
+
+A game is fully determined by its seed, its settings and the (keys, dt) pair passed to step() on every frame, so that is all
+a recording holds, plus the final score, wave and lives to check a replay against. Keys and dt are stored as
+two separate streams of runs of identical values, because they change independently: keys when the player
+presses something, dt whenever the frame time jitters. Both streams are compressed with zlib, which keeps a 30
+minute session at a few KB.
+
+File layout (little endian):
+    header: magic b"ASRP", version (uint8), flags (uint8), seed (uint64), frames (uint32), score (uint32),
+            wave (uint32), lives (int32), world width (uint32), world height (uint32)
+    dt table: count (uint8), then count float64 values
+    keys: compressed size (uint32), then zlib compressed (run length varint, keys uint8) pairs
+    dt: compressed size (uint32), then zlib compressed (run length varint, dt table index uint8) pairs
+'''
+import struct
+import zlib
+
+from .config import WORLD_SIZE, ENTITY_STORE
+from .simulation import GameState, step
+
+MAGIC = b"ASRP"
+VERSION = 5 # Version 4 missed hits across the edges of large worlds, 3 had no world size, 2 spawned waves from the game's own generator, 1 had no fixed time step
+HEADER = struct.Struct("<4sBBQIIIiII")
+FLAG_INSTRUCTIONS = 1 # The game started with the instructions overlay shown
+FLAG_PRECISE_COLLISIONS = 2 # The game checked hits against the letters' pixels
+MAX_DT_VALUES = 255 # Distinct dt values a recording can hold
+
+class ReplayError(Exception):
+    '''
+    Raised when a recording cannot be read or no longer fits in the file format.
+    '''
+
+class Recording:
+    '''
+    Seed, per-frame inputs and final results of one game.
+    
+    Arguments:
+        seed (int): Seed the game was created with.
+        show_instructions (bool): Whether the game started with the instructions overlay shown.
+        precise_collisions (bool): Whether the game checked hits against the letters' pixels.
+        world_size (tuple): Width and height of the game's world.
+    '''
+    def __init__(self, seed, show_instructions=True, precise_collisions=False, world_size=WORLD_SIZE):
+        self.seed = seed
+        self.show_instructions = show_instructions
+        self.precise_collisions = precise_collisions
+        self.world_size = tuple(world_size)
+        self.key_runs = [] # [length, keys] for every run of frames with the same keys
+        self.dt_runs = [] # [length, dt] for every run of frames with the same dt
+        self.frames = 0
+        self.result = None # (score, wave, lives) once finished
+    
+    @classmethod
+    def for_game(cls, state):
+        '''
+        Starts a recording for a game that has not been stepped yet.
+        
+        Arguments:
+            state (GameState): Game to record.
+        
+        Returns:
+            Recording: An empty recording with the game's seed.
+        '''
+        return cls(state.seed, state.first_time_instructions_overlay, state.precise_collisions,
+                   (state.world_width, state.world_height))
+    
+    def new_game(self, entity_store=ENTITY_STORE):
+        '''
+        Creates the game the recording starts from.
+        
+        Arguments:
+            entity_store (bool): Keep the game's asteroids and bullets in a NumPy EntityStore.
+        
+        Returns:
+            GameState: A fresh game with the recorded seed.
+        '''
+        return GameState(self.seed, self.show_instructions, self.precise_collisions, self.world_size, entity_store)
+    
+    def record(self, keys, dt):
+        '''
+        Appends one frame.
+        
+        Arguments:
+            keys (int): Input bitmask passed to step().
+            dt (float): Time step passed to step().
+        '''
+        for runs, value in ((self.key_runs, keys), (self.dt_runs, dt)):
+            if runs and runs[-1][1] == value:
+                runs[-1][0] += 1
+            else:
+                runs.append([1, value])
+        self.frames += 1
+    
+    def finish(self, state):
+        '''
+        Stores the results a replay must reproduce.
+        
+        Arguments:
+            state (GameState): The recorded game after its last frame.
+        '''
+        self.result = (state.score, state.current_wave, state.lives)
+    
+    def inputs(self):
+        '''
+        Yields the recorded frames in order.
+        
+        Yields:
+            tuple: (keys, dt) for every frame.
+        '''
+        dt_runs = iter(self.dt_runs)
+        dt_left = 0
+        for length, keys in self.key_runs:
+            for _ in range(length):
+                if not dt_left:
+                    dt_left, dt = next(dt_runs)
+                dt_left -= 1
+                yield keys, dt
+    
+    def to_bytes(self):
+        '''
+        Serializes the recording.
+        
+        Returns:
+            bytes: The recording in the file format described at the top of this module.
+        '''
+        dt_values = list(dict.fromkeys(dt for _, dt in self.dt_runs))
+        if len(dt_values) > MAX_DT_VALUES:
+            raise ReplayError(f"too many distinct dt values to record ({len(dt_values)})")
+        dt_index = {dt: index for index, dt in enumerate(dt_values)}
+        score, wave, lives = self.result or (0, 0, 0)
+        flags = (FLAG_INSTRUCTIONS if self.show_instructions else 0) | (FLAG_PRECISE_COLLISIONS if self.precise_collisions else 0)
+        keys = zlib.compress(pack_runs(self.key_runs), 9)
+        dts = zlib.compress(pack_runs([length, dt_index[dt]] for length, dt in self.dt_runs), 9)
+        return b"".join([
+            HEADER.pack(MAGIC, VERSION, flags, self.seed, self.frames, score, wave, lives, *self.world_size),
+            struct.pack(f"<B{len(dt_values)}d", len(dt_values), *dt_values),
+            struct.pack("<I", len(keys)), keys,
+            struct.pack("<I", len(dts)), dts,
+        ])
+    
+    @classmethod
+    def from_bytes(cls, data):
+        '''
+        Reads a recording produced by to_bytes().
+        
+        Arguments:
+            data (bytes): Serialized recording.
+        
+        Returns:
+            Recording: The recording.
+        '''
+        try:
+            magic, version, flags, seed, frames, score, wave, lives, *world_size = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                raise ReplayError("not an Alphastroid recording of a supported version")
+            offset = HEADER.size
+            count = data[offset]
+            dt_values = struct.unpack_from(f"<{count}d", data, offset + 1)
+            offset += 1 + 8 * count
+            streams = []
+            for _ in range(2):
+                size, = struct.unpack_from("<I", data, offset)
+                streams.append(unpack_runs(zlib.decompress(data[offset + 4:offset + 4 + size])))
+                offset += 4 + size
+            key_runs, dt_runs = streams
+            dt_runs = [[length, dt_values[index]] for length, index in dt_runs]
+        except (struct.error, IndexError, zlib.error) as error:
+            raise ReplayError(f"corrupt recording: {error}") from error
+        if sum(length for length, _ in key_runs) != frames or sum(length for length, _ in dt_runs) != frames:
+            raise ReplayError("corrupt recording: frame count does not match its inputs")
+        
+        recording = cls(seed, bool(flags & FLAG_INSTRUCTIONS), bool(flags & FLAG_PRECISE_COLLISIONS), world_size)
+        recording.frames = frames
+        recording.result = (score, wave, lives)
+        recording.key_runs = key_runs
+        recording.dt_runs = dt_runs
+        return recording
+    
+    def save(self, path):
+        '''
+        Writes the recording to a file.
+        
+        Arguments:
+            path (str): File to write.
+        '''
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path):
+        '''
+        Reads a recording from a file.
+        
+        Arguments:
+            path (str): File to read.
+        
+        Returns:
+            Recording: The recording.
+        '''
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+def pack_runs(runs):
+    '''
+    Encodes runs as a varint length followed by a one byte value.
+    
+    Arguments:
+        runs (iterable): [length, value] pairs with values from 0 to 255.
+    
+    Returns:
+        bytes: The encoded runs.
+    '''
+    packed = bytearray()
+    for length, value in runs:
+        while length >= 0x80:
+            packed.append(length & 0x7f | 0x80)
+            length >>= 7
+        packed += bytes((length, value))
+    return bytes(packed)
+
+def unpack_runs(packed):
+    '''
+    Decodes runs written by pack_runs().
+    
+    Arguments:
+        packed (bytes): The encoded runs.
+    
+    Returns:
+        list: [length, value] pairs.
+    '''
+    runs = []
+    position = 0
+    while position < len(packed):
+        length, shift = 0, 0
+        while packed[position] & 0x80:
+            length |= (packed[position] & 0x7f) << shift
+            shift += 7
+            position += 1
+        length |= packed[position] << shift
+        runs.append([length, packed[position + 1]])
+        position += 2
+    return runs
+
+def replay_headless(recording, entity_store=ENTITY_STORE):
+    '''
+    Replays a recording as fast as possible without drawing anything.
+    
+    Arguments:
+        recording (Recording): Recording to replay.
+        entity_store (bool): Keep the asteroids and bullets in a NumPy EntityStore.
+    
+    Returns:
+        GameState: The game after the last recorded frame.
+    '''
+    state = recording.new_game(entity_store)
+    for keys, dt in recording.inputs():
+        step(state, keys, dt)
+    return state
+
+def verify(recording, state):
+    '''
+    Compares a replayed game with the results stored in its recording.
+    
+    Arguments:
+        recording (Recording): Recording that was replayed.
+        state (GameState): The game after the replay.
+    
+    Returns:
+        list: Human readable description of every mismatch; empty if the replay matched.
+    '''
+    actual = {'frames': state.frame, 'score': state.score, 'current_wave': state.current_wave, 'lives': state.lives}
+    expected = dict(zip(actual, (recording.frames,) + recording.result))
+    return [f"{name}: recorded {expected[name]}, replayed {actual[name]}" for name in actual
+            if actual[name] != expected[name]]
+
+def report_replay(recording, state):
+    '''
+    Prints whether a finished replay reproduced the recorded results.
+    
+    Arguments:
+        recording (Recording): Recording that was replayed.
+        state (GameState): The game after the replay.
+    
+    Returns:
+        bool: True if the replay matched.
+    '''
+    mismatches = verify(recording, state)
+    for mismatch in mismatches:
+        print("Replay mismatch:", mismatch)
+    if not mismatches:
+        print(f"Replay matches the recording: score={state.score} wave={state.current_wave} lives={state.lives}")
+    return not mismatches
@@ -0,0 +1,353 @@
+'''
+The game simulation. It does not import pygame, so it runs without a display.
+'''
+import math
+import random
+
+from .config import (WIDTH, HEIGHT, SIM_DT, SHIP_TURN_SPEED, SHIP_ACCELERATION, FRICTION, MAX_SPEED, BULLET_COOLDOWN, STAR_LAYER_SPEEDS, ASTEROID_POOL_SIZE, BULLET_POOL_SIZE, PRECISE_COLLISIONS,
+                     WORLD_SIZE, FAR_UPDATE_INTERVAL, ENTITY_STORE)
+from .entities import (Asteroid, Bullet, Pool, create_fragments, update_fragments, init_asteroids, plan_wave,
+                       spawn_wave, create_bullet, init_stars)
+from .collision import SpatialHash, collision_grid, find_ship_collision, collide_bullets_with_asteroids
+
+# Input bitmask flags passed to step(), one per action the player can hold down
+INPUT_LEFT = 1 # A or left arrow
+INPUT_RIGHT = 2 # D or right arrow
+INPUT_THRUST = 4 # W or up arrow
+INPUT_FIRE = 8 # Spacebar
+INPUT_DOWN = 16 # S or down arrow (only used to dismiss the instructions)
+
+# Game state and simulation
+class GameState:
+    '''
+    Holds everything that changes while a game is played, so the simulation can run without any globals.
+    
+    Each game owns its own seeded random number generator, which makes a game fully reproducible from its
+    seed and the inputs passed to step().
+    
+    Arguments:
+        seed (int or None): Seed for the game's random number generator. A random seed is picked if None.
+        show_instructions (bool): Whether the instructions overlay is shown until a control key is pressed.
+        precise_collisions (bool): Check hits against the letters' pixels, which needs pygame, instead of only
+            their bounding circles.
+        world_size (tuple): Width and height of the wrapping world, at least the size of the playfield. In a
+            larger world the view follows the ship, and asteroids far from it move less often.
+        entity_store (bool): Keep the asteroids and bullets in a NumPy EntityStore, which moves and collides them
+            vectorized. The game plays exactly the same either way.
+    '''
+    def __init__(self, seed=None, show_instructions=True, precise_collisions=PRECISE_COLLISIONS, world_size=WORLD_SIZE,
+                 entity_store=ENTITY_STORE):
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed) # Every random decision in the game goes through this generator
+        self.precise_collisions = precise_collisions
+        self.collision_masks = None # Letter masks checked after the circle test when collisions are precise
+        if precise_collisions:
+            from .caches import mask_cache # Imported here so circle-only games never load pygame
+            self.collision_masks = mask_cache
+        self.world_width, self.world_height = world_size # Everything wraps around at the world's edges
+        self.scrolling = (self.world_width, self.world_height) != (WIDTH, HEIGHT) # The view follows the ship
+        # Broad phase grid, shared by every game the size of the playfield
+        self.collision_grid = SpatialHash(self.world_width, self.world_height) if self.scrolling else collision_grid
+        self.frame = 0 # Number of steps simulated
+        self.game_over = False # Set once the last life is lost and the respawn delay has passed
+        # Ship
+        self.ship_pos = [self.world_width // 2, self.world_height // 2] # Initial ship position
+        self.ship_angle = 0 # Initial rotation angle of the ship
+        self.prev_ship_pos = self.ship_pos[:] # Ship position before the last step, for render interpolation
+        self.prev_ship_angle = 0 # Ship angle before the last step
+        self.ship_velocity = [0, 0] # Initial velocity vector of the ship
+        self.ship_fragments = [] # Debris fragments after ship destruction
+        self.ship_alive = True # Boolean for ship life status
+        self.thrusting = False # Boolean indicating if the ship is accelerating
+        # Entities
+        self.entity_store = None # EntityStore holding the asteroids and bullets when they are kept in arrays
+        if entity_store:
+            from .store import EntityStore # Imported here so games without the store never load NumPy
+            self.entity_store = EntityStore()
+            self.asteroids = self.entity_store.asteroids
+            self.bullets = self.entity_store.bullets
+        else:
+            self.asteroids = Pool(Asteroid, ASTEROID_POOL_SIZE) # Live asteroids, reused instead of reallocated
+            self.bullets = Pool(Bullet, BULLET_POOL_SIZE) # Live bullets, reused instead of reallocated
+        self.stars = [] # List to store background stars
+        self.star_offsets = [[0, 0] for _ in STAR_LAYER_SPEEDS] # Parallax scroll offset of each star layer
+        self.prev_star_offsets = [[0, 0] for _ in STAR_LAYER_SPEEDS] # Offsets before the last step
+        # Timers and counters
+        self.bullet_timer = 0 # Time left until another bullet can be fired
+        self.lives = 3 # Number of remaining lives
+        self.invincible = False # Whether the ship is temporarily invincible
+        self.invincibility_timer = 0 # Timer for invincibility duration
+        self.respawn_timer = 0 # Timer for ship respawn
+        self.score = 0 # Current player score
+        self.current_wave = 1 # Current wave of asteroids
+        self.next_wave = None # WavePlan of the next wave when it was prepared ahead, planned on the spot otherwise
+        self.first_time_instructions_overlay = show_instructions # Boolean for instructions shown status
+        self.instruction_timer = 1 # Delay before a key press can dismiss the instructions
+        # Populate the playfield
+        init_stars(self)
+        init_asteroids(self)
+
+def step(state, keys, dt, timer=None):
+    '''
+    Advances a game by one step. Nothing here touches the display, so it runs the same with or without a window.
+    
+    The window and headless runs always pass the fixed SIM_DT, so a game plays the same at any frame rate. The
+    ship, asteroid, bullet and star positions from before the step are kept for render interpolation.
+    
+    Arguments:
+        state (GameState): Game to advance, updated in place.
+        keys (int): Combination of the INPUT_* flags held down this frame.
+        dt (float): Time step in seconds.
+        timer (FrameTimer or None): Receives a lap at the end of each phase when given.
+    '''
+    if state.game_over:
+        return
+    state.frame += 1
+    
+    # Keep where everything was for drawing in between steps
+    state.prev_ship_pos[0], state.prev_ship_pos[1] = state.ship_pos
+    state.prev_ship_angle = state.ship_angle
+    for previous, offset in zip(state.prev_star_offsets, state.star_offsets):
+        previous[0], previous[1] = offset
+    
+    # Ship respawning
+    if not state.ship_alive:
+        state.respawn_timer -= dt
+        if state.lives > 0:
+            # Respawn ship if lives are left and timer expires
+            if state.respawn_timer <= 0:
+                state.ship_alive = True
+                state.invincible = True
+                state.invincibility_timer = 2 # 2 seconds of invincibility
+                state.ship_angle = 0
+                state.ship_pos = [state.world_width / 2, state.world_height / 2]
+                state.ship_velocity = [0, 0]
+                state.prev_ship_pos[0], state.prev_ship_pos[1] = state.ship_pos # Appear in place instead of gliding there
+                state.prev_ship_angle = 0
+        else:
+            # End the game if no lives remain
+            if state.respawn_timer <= 0:
+                state.game_over = True
+    
+    # Invincibility logic
+    if state.invincible:
+        state.invincibility_timer -= dt
+        if state.invincibility_timer <= 0:
+            state.invincible = False
+    
+    if state.instruction_timer > 0:
+        state.instruction_timer -= dt
+    
+    # Disable instructions after any control key is pressed
+    if state.first_time_instructions_overlay and state.instruction_timer <= 0 and keys:
+        state.first_time_instructions_overlay = False
+    
+    state.thrusting = False # Track whether ship is accelerating
+    ship_velocity = state.ship_velocity
+    
+    if state.ship_alive:
+        # Rotate ship
+        if keys & INPUT_LEFT:
+            state.ship_angle -= SHIP_TURN_SPEED * dt
+        if keys & INPUT_RIGHT:
+            state.ship_angle += SHIP_TURN_SPEED * dt
+        
+        # Apply thrust in direction the ship is facing
+        if keys & INPUT_THRUST:
+            ship_angle_shifted = state.ship_angle - 90
+            ship_velocity[0] += math.cos(math.radians(ship_angle_shifted)) * SHIP_ACCELERATION * dt
+            ship_velocity[1] += math.sin(math.radians(ship_angle_shifted)) * SHIP_ACCELERATION * dt
+            state.thrusting = True
+        
+        # Fire a bullet if space is pressed and cooldown has expired
+        if keys & INPUT_FIRE and state.bullet_timer <= 0:
+            create_bullet(state)
+            state.bullet_timer = BULLET_COOLDOWN
+    if timer:
+        timer.lap("input")
+    
+    # Ship physics
+    # Apply friction to slow the ship over time making the game more controllable
+    friction = FRICTION ** dt # FRICTION is per second, so scale it to the length of the step
+    ship_velocity[0] *= friction
+    ship_velocity[1] *= friction
+    
+    # Cap ship speed to MAX_SPEED using vector normalization (scaling to a magnitude of 1)
+    speed = math.hypot(ship_velocity[0], ship_velocity[1]) # Calculate speed using pythagorean theorem
+    if speed > MAX_SPEED:
+        scale = MAX_SPEED / speed
+        ship_velocity[0] *= scale
+        ship_velocity[1] *= scale
+    
+    # Update ship position and wrap around the world's edges
+    world_width, world_height = state.world_width, state.world_height
+    ship_pos = state.ship_pos
+    ship_pos[0] = (ship_pos[0] + ship_velocity[0] * dt) % world_width
+    ship_pos[1] = (ship_pos[1] + ship_velocity[1] * dt) % world_height
+    if timer:
+        timer.lap("ship_physics")
+    
+    # Check for ship asteroid collision
+    world = (world_width, world_height) if state.scrolling else None # Hits are found across the edges the view scrolls over
+    store = state.entity_store
+    if state.ship_alive and not state.invincible:
+        if store is not None:
+            hit = store.find_ship_collision(ship_pos, state.collision_masks, world)
+        else:
+            hit = find_ship_collision(state.asteroids, ship_pos, state.collision_masks, state.collision_grid, state.scrolling, world)
+    else:
+        hit = None
+    if hit is not None:
+        # Destroy ship and reduce life
+        state.lives -= 1
+        state.ship_fragments.extend(create_fragments(ship_pos, state.rng))
+        state.ship_alive = False
+        state.respawn_timer = 1.5 # Delay before respawning
+    if timer:
+        timer.lap("collision")
+    
+    # Update asteroid position and wrap around the world's edges
+    if store is not None:
+        store.move_asteroids(state, dt) # The same updates, vectorized
+    elif not state.scrolling:
+        for asteroid in state.asteroids:
+            asteroid.prev_x = asteroid.x
+            asteroid.prev_y = asteroid.y
+            asteroid.prev_angle = asteroid.angle
+            asteroid.x = (asteroid.x + asteroid.vx * dt) % world_width
+            asteroid.y = (asteroid.y + asteroid.vy * dt) % world_height
+            asteroid.angle = (asteroid.angle + asteroid.spin * dt) % 360
+    else:
+        # Asteroids more than a playfield away from the ship are out of view, so they only move every
+        # FAR_UPDATE_INTERVAL steps (spread over the steps by pool index), by all the time they missed
+        phase = state.frame % FAR_UPDATE_INTERVAL
+        for index, asteroid in enumerate(state.asteroids):
+            asteroid.lag += dt
+            if asteroid.far and (index + phase) % FAR_UPDATE_INTERVAL:
+                continue
+            elapsed = asteroid.lag
+            asteroid.lag = 0
+            asteroid.prev_x = asteroid.x
+            asteroid.prev_y = asteroid.y
+            asteroid.prev_angle = asteroid.angle
+            asteroid.x = (asteroid.x + asteroid.vx * elapsed) % world_width
+            asteroid.y = (asteroid.y + asteroid.vy * elapsed) % world_height
+            asteroid.angle = (asteroid.angle + asteroid.spin * elapsed) % 360
+            # Shortest distance to the ship across the wrapping edges
+            distance_x = abs(asteroid.x - ship_pos[0])
+            distance_y = abs(asteroid.y - ship_pos[1])
+            asteroid.far = min(distance_x, world_width - distance_x) > WIDTH or min(distance_y, world_height - distance_y) > HEIGHT
+    if timer:
+        timer.lap("asteroid_update")
+    
+    # Update bullets
+    state.bullet_timer -= dt
+    if state.bullet_timer < 0:
+        state.bullet_timer = 0 # Prevent negative cooldowns
+    
+    if store is not None:
+        store.move_bullets(state, dt) # The same updates and removals, vectorized
+    else:
+        bullets = state.bullets
+        expired = False
+        for bullet in bullets:
+            # Update bullet position using its velocity and delta time
+            bullet.prev_x = bullet.x
+            bullet.prev_y = bullet.y
+            bullet.x += bullet.vx * dt
+            bullet.y += bullet.vy * dt
+            if state.scrolling:
+                # Bullets fly off the edges of the playfield, but wrap around those of a larger world
+                bullet.x %= world_width
+                bullet.y %= world_height
+            bullet.life -= dt # Crease the bullet's lifespan
+            expired = expired or bullet.life <= 0
+        if expired:
+            # Remove expired bullets back to front, so every swapped in bullet has already been checked
+            for index in range(len(bullets) - 1, -1, -1):
+                if bullets[index].life <= 0:
+                    bullets.release(index)
+    if timer:
+        timer.lap("bullet_update")
+    
+    # Check for bullet asteroid collision
+    if store is not None:
+        destroyed = store.collide_bullets_with_asteroids(state.rng, state.collision_masks, world)
+    else:
+        destroyed = collide_bullets_with_asteroids(state.bullets, state.asteroids, state.rng, state.collision_masks, state.collision_grid,
+                                                   ship_pos if state.scrolling else None, world)
+    state.score += 100 * destroyed # Add to player's score for every asteroid destroyed
+    if timer:
+        timer.lap("collision")
+    
+    # If all asteroids have been destroyed, start a new wave
+    if len(state.asteroids) == 0:
+        state.current_wave += 1 # Increase wave number
+        # Spawn more asteroids with each wave (increasing difficulty), as planned ahead if the plan is ready
+        plan = state.next_wave
+        if plan is None or plan.wave != state.current_wave:
+            plan = plan_wave(state.seed, state.current_wave, world_width, world_height)
+        spawn_wave(state, plan)
+        state.next_wave = None
+    if timer:
+        timer.lap("wave_spawn")
+    
+    # Scroll the star layers for parallax based on ship movement and each layer's depth
+    for offset, speed_factor in zip(state.star_offsets, STAR_LAYER_SPEEDS):
+        # Wrap around the screen for a seamless infinite field
+        offset[0] = (offset[0] - ship_velocity[0] * speed_factor * dt) % WIDTH
+        offset[1] = (offset[1] - ship_velocity[1] * speed_factor * dt) % HEIGHT
+    if timer:
+        timer.lap("star_parallax")
+    
+    # Move and fade debris from a destroyed ship
+    update_fragments(state.ship_fragments, dt)
+    if timer:
+        timer.lap("fragment_update")
+
+def demo_input(frame):
+    '''
+    Scripted input used for headless runs: keep firing while sweeping around and thrusting in short bursts.
+    
+    Arguments:
+        frame (int): Frame number.
+    
+    Returns:
+        int: Combination of the INPUT_* flags.
+    '''
+    keys = INPUT_FIRE | INPUT_RIGHT
+    if frame % 120 < 20:
+        keys |= INPUT_THRUST
+    return keys
+
+def run_headless(frames, seed=None, inputs=demo_input, dt=SIM_DT, recording=None, precise_collisions=PRECISE_COLLISIONS,
+                 world_size=WORLD_SIZE, entity_store=ENTITY_STORE):
+    '''
+    Simulates a game as fast as possible without drawing anything.
+    
+    Arguments:
+        frames (int): Maximum number of steps to simulate; stops early on game over.
+        seed (int or None): Seed for the game's random number generator.
+        inputs (callable): Function taking the frame number and returning the input bitmask for it.
+        dt (float): Fixed time step in seconds.
+        recording (Recording or None): Recording of a game with the same seed and settings and no instructions.
+            Every frame is appended to it and the final results are stored in it.
+        precise_collisions (bool): Check hits against the letters' pixels instead of their bounding circles.
+        world_size (tuple): Width and height of the wrapping world.
+        entity_store (bool): Keep the asteroids and bullets in a NumPy EntityStore.
+    
+    Returns:
+        GameState: The game after the last simulated frame.
+    '''
+    state = GameState(seed, show_instructions=False, precise_collisions=precise_collisions, world_size=world_size,
+                      entity_store=entity_store)
+    for frame in range(frames):
+        if state.game_over:
+            break
+        keys = inputs(frame)
+        if recording is not None:
+            recording.record(keys, dt)
+        step(state, keys, dt)
+    if recording is not None:
+        recording.finish(state)
+    return state
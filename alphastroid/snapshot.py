@@ -0,0 +1,305 @@
+'''
+Snapshots of a game, for quick-saves, rewinding and branching the simulation.
+
+A snapshot holds everything step() reads or changes, flattened into float64 arrays: the game's numbers (timers,
+counters, flags, ship and star offsets), one row per live asteroid, bullet and ship fragment, and the state of
+the game's random number generator. Taking or restoring one copies a few hundred floats and allocates nothing
+per entity, so it takes microseconds. The stars are not stored: step() never changes them, and init_stars()
+creates the same stars from the seed again.
+
+File layout (little endian):
+    header: magic b"ASSN", version (uint8), flags (uint8), seed (uint64), world width (uint32), world height (uint32),
+            numbers (uint32), asteroids (uint32), bullets (uint32), fragments (uint32)
+    random number generator: 625 uint32 words, then the cached gaussian (float64, only used with FLAG_GAUSS)
+    numbers, then asteroid, bullet and fragment rows: float64 values, fields in the order of the *_FIELDS below
+    letters: one ASCII byte per asteroid
+'''
+import sys
+import struct
+from array import array
+from collections import deque
+from itertools import chain
+from operator import attrgetter
+
+from .config import STAR_LAYER_SPEEDS, REWIND_INTERVAL, REWIND_HISTORY, ENTITY_STORE
+from .simulation import GameState
+
+MAGIC = b"ASSN"
+VERSION = 1
+HEADER = struct.Struct("<4sBBQIIIIII")
+RANDOM_STATE = struct.Struct("<625Id") # Mersenne Twister words and position, and the cached gaussian
+FLAG_PRECISE_COLLISIONS = 1 # The game checks hits against the letters' pixels
+FLAG_GAUSS = 2 # The random number generator holds a cached gaussian
+
+# GameState attributes stored as one number each, by how they are turned back from floats
+INT_FIELDS = ('frame', 'lives', 'score', 'current_wave')
+FLOAT_FIELDS = ('ship_angle', 'prev_ship_angle', 'bullet_timer', 'invincibility_timer', 'respawn_timer',
+                'instruction_timer')
+FLAG_FIELDS = ('game_over', 'ship_alive', 'thrusting', 'invincible', 'first_time_instructions_overlay')
+# Followed by ship_pos, prev_ship_pos, ship_velocity, star_offsets and prev_star_offsets as (x, y) pairs
+NUMBER_COUNT = len(INT_FIELDS) + len(FLOAT_FIELDS) + len(FLAG_FIELDS) + 6 + 4 * len(STAR_LAYER_SPEEDS)
+
+ASTEROID_FIELDS = ('x', 'y', 'vx', 'vy', 'size', 'angle', 'spin', 'prev_x', 'prev_y', 'prev_angle', 'far', 'lag')
+BULLET_FIELDS = ('x', 'y', 'vx', 'vy', 'life', 'prev_x', 'prev_y')
+FRAGMENT_FIELDS = ('start x', 'start y', 'end x', 'end y', 'vx', 'vy', 'transparency')
+
+get_numbers = attrgetter(*INT_FIELDS, *FLOAT_FIELDS, *FLAG_FIELDS)
+get_asteroid = attrgetter(*ASTEROID_FIELDS)
+get_bullet = attrgetter(*BULLET_FIELDS)
+get_letter = attrgetter('letter')
+
+class SnapshotError(Exception):
+    '''
+    Raised when a snapshot cannot be read or does not belong to the game it is restored into.
+    '''
+
+class Snapshot:
+    '''
+    Copy of a game at one moment, which can be restored into it any number of times.
+    
+    Restoring writes into the game's existing objects and pools, so anything holding on to the game (the window,
+    a WavePreparer) keeps working. Snapshots are only restored into the game they were taken of, or one with the
+    same seed and settings; new_game() creates such a game.
+    
+    Arguments:
+        state (GameState): Game to take the snapshot of.
+    '''
+    __slots__ = ('seed', 'precise_collisions', 'world_size', 'frame', 'numbers', 'asteroids', 'letters', 'bullets',
+                 'fragments', 'random_state', 'next_wave')
+    
+    def __init__(self, state):
+        self.seed = state.seed
+        self.precise_collisions = state.precise_collisions
+        self.world_size = (state.world_width, state.world_height)
+        self.frame = state.frame
+        numbers = array('d', get_numbers(state))
+        for pair in chain((state.ship_pos, state.prev_ship_pos, state.ship_velocity), state.star_offsets,
+                          state.prev_star_offsets):
+            numbers.extend(pair)
+        self.numbers = numbers
+        self.asteroids = array('d', chain.from_iterable(map(get_asteroid, state.asteroids)))
+        self.letters = "".join(map(get_letter, state.asteroids))
+        self.bullets = array('d', chain.from_iterable(map(get_bullet, state.bullets)))
+        self.fragments = array('d', chain.from_iterable(
+            (*fragment['start'], *fragment['end'], fragment['vx'], fragment['vy'], fragment['transparency'])
+            for fragment in state.ship_fragments))
+        self.random_state = state.rng.getstate() # An immutable tuple, so it is shared rather than copied
+        self.next_wave = state.next_wave # Plans are never changed once made; not saved to files, as step() makes it again
+    
+    def restore(self, state):
+        '''
+        Puts a game back to the moment the snapshot was taken.
+        
+        Arguments:
+            state (GameState): The game the snapshot was taken of, or one with the same seed and settings.
+        '''
+        if (state.seed, state.precise_collisions, (state.world_width, state.world_height)) != \
+                (self.seed, self.precise_collisions, self.world_size):
+            raise SnapshotError("snapshot of a game with a different seed or settings")
+        numbers = self.numbers
+        index = 0
+        for name in INT_FIELDS:
+            setattr(state, name, int(numbers[index]))
+            index += 1
+        for name in FLOAT_FIELDS:
+            setattr(state, name, numbers[index])
+            index += 1
+        for name in FLAG_FIELDS:
+            setattr(state, name, bool(numbers[index]))
+            index += 1
+        for pair in chain((state.ship_pos, state.prev_ship_pos, state.ship_velocity), state.star_offsets,
+                          state.prev_star_offsets):
+            pair[0], pair[1] = numbers[index], numbers[index + 1]
+            index += 2
+        
+        asteroids = state.asteroids
+        asteroids.clear()
+        rows = zip(*[iter(self.asteroids)] * len(ASTEROID_FIELDS))
+        for letter, (x, y, vx, vy, size, angle, spin, prev_x, prev_y, prev_angle, far, lag) in zip(self.letters, rows):
+            asteroid = asteroids.acquire()
+            asteroid.set(x, y, vx, vy, letter, size, angle, spin)
+            asteroid.prev_x = prev_x
+            asteroid.prev_y = prev_y
+            asteroid.prev_angle = prev_angle
+            asteroid.far = bool(far)
+            asteroid.lag = lag
+        
+        bullets = state.bullets
+        bullets.clear()
+        for x, y, vx, vy, life, prev_x, prev_y in zip(*[iter(self.bullets)] * len(BULLET_FIELDS)):
+            bullet = bullets.acquire()
+            bullet.set(x, y, vx, vy, life)
+            bullet.prev_x = prev_x
+            bullet.prev_y = prev_y
+        
+        state.ship_fragments[:] = [
+            {'start': [start_x, start_y], 'end': [end_x, end_y], 'vx': vx, 'vy': vy, 'transparency': transparency}
+            for start_x, start_y, end_x, end_y, vx, vy, transparency in zip(*[iter(self.fragments)] * len(FRAGMENT_FIELDS))]
+        state.rng.setstate(self.random_state)
+        state.next_wave = self.next_wave
+    
+    def new_game(self, entity_store=ENTITY_STORE):
+        '''
+        Creates a game with the snapshot's seed and settings and restores the snapshot into it.
+        
+        Arguments:
+            entity_store (bool): Keep the game's asteroids and bullets in a NumPy EntityStore.
+        
+        Returns:
+            GameState: The game at the moment the snapshot was taken.
+        '''
+        state = GameState(self.seed, False, self.precise_collisions, self.world_size, entity_store)
+        self.restore(state)
+        return state
+    
+    def to_bytes(self):
+        '''
+        Serializes the snapshot.
+        
+        Returns:
+            bytes: The snapshot in the file format described at the top of this module.
+        '''
+        version, words, gauss = self.random_state
+        flags = (FLAG_PRECISE_COLLISIONS if self.precise_collisions else 0) | (FLAG_GAUSS if gauss is not None else 0)
+        return b"".join([
+            HEADER.pack(MAGIC, VERSION, flags, self.seed, *self.world_size, len(self.numbers), len(self.letters),
+                        len(self.bullets) // len(BULLET_FIELDS), len(self.fragments) // len(FRAGMENT_FIELDS)),
+            RANDOM_STATE.pack(*words, gauss or 0),
+            little_endian(self.numbers), little_endian(self.asteroids), little_endian(self.bullets),
+            little_endian(self.fragments),
+            self.letters.encode('ascii'),
+        ])
+    
+    @classmethod
+    def from_bytes(cls, data):
+        '''
+        Reads a snapshot produced by to_bytes().
+        
+        Arguments:
+            data (bytes): Serialized snapshot.
+        
+        Returns:
+            Snapshot: The snapshot.
+        '''
+        try:
+            magic, version, flags, seed, *world_size, numbers, asteroids, bullets, fragments = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                raise SnapshotError("not an Alphastroid snapshot of a supported version")
+            if numbers != NUMBER_COUNT:
+                raise SnapshotError("snapshot of a game with a different number of star layers")
+            *words, gauss = RANDOM_STATE.unpack_from(data, HEADER.size)
+            offset = HEADER.size + RANDOM_STATE.size
+            rows = []
+            for count in (numbers, asteroids * len(ASTEROID_FIELDS), bullets * len(BULLET_FIELDS),
+                          fragments * len(FRAGMENT_FIELDS)):
+                values = array('d', data[offset:offset + 8 * count])
+                if len(values) != count:
+                    raise SnapshotError("corrupt snapshot: truncated")
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                rows.append(values)
+                offset += 8 * count
+            letters = data[offset:offset + asteroids].decode('ascii')
+            if len(letters) != asteroids:
+                raise SnapshotError("corrupt snapshot: truncated")
+        except (struct.error, ValueError) as error:
+            raise SnapshotError(f"corrupt snapshot: {error}") from error
+        
+        snapshot = cls.__new__(cls)
+        snapshot.seed = seed
+        snapshot.precise_collisions = bool(flags & FLAG_PRECISE_COLLISIONS)
+        snapshot.world_size = tuple(world_size)
+        snapshot.frame = int(rows[0][0]) # frame is the first number
+        snapshot.numbers, snapshot.asteroids, snapshot.bullets, snapshot.fragments = rows
+        snapshot.letters = letters
+        snapshot.random_state = (3, tuple(words), gauss if flags & FLAG_GAUSS else None) # 3 is random.Random's state version
+        snapshot.next_wave = None
+        return snapshot
+    
+    def save(self, path):
+        '''
+        Writes the snapshot to a file.
+        
+        Arguments:
+            path (str): File to write.
+        '''
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path):
+        '''
+        Reads a snapshot from a file.
+        
+        Arguments:
+            path (str): File to read.
+        
+        Returns:
+            Snapshot: The snapshot.
+        '''
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+class Rewind:
+    '''
+    Keeps snapshots of the last seconds of a game, to go back to a moment before something happened, such as
+    the ship being destroyed.
+    
+    Arguments:
+        interval (int): Steps between snapshots.
+        history (int): Number of snapshots kept.
+    '''
+    def __init__(self, interval=REWIND_INTERVAL, history=REWIND_HISTORY):
+        self.interval = interval
+        self.snapshots = deque(maxlen=history)
+    
+    def update(self, state):
+        '''
+        Takes a snapshot every interval steps. Call after every step.
+        
+        Arguments:
+            state (GameState): Game in progress.
+        '''
+        if state.frame % self.interval == 0:
+            self.snapshots.append(Snapshot(state))
+    
+    def rewind(self, state, steps):
+        '''
+        Restores the newest snapshot taken at least the given number of steps ago, or the oldest one kept, and drops
+        the snapshots after it.
+        
+        Arguments:
+            state (GameState): Game the snapshots were taken of.
+            steps (int): Steps to go back at least.
+        
+        Returns:
+            bool: True if a snapshot was restored.
+        '''
+        snapshots = self.snapshots
+        while len(snapshots) > 1 and snapshots[-1].frame > state.frame - steps:
+            snapshots.pop()
+        if not snapshots:
+            return False
+        snapshots[-1].restore(state)
+        return True
+    
+    def clear(self):
+        '''
+        Drops every snapshot, e.g. when a new game starts.
+        '''
+        self.snapshots.clear()
+
+def little_endian(values):
+    '''
+    Returns the bytes of a float64 array in little endian order, whatever the machine's byte order.
+    
+    Arguments:
+        values (array.array): Array to convert.
+    
+    Returns:
+        bytes: The array's values.
+    '''
+    if sys.byteorder == 'big':
+        values = array('d', values)
+        values.byteswap()
+    return values.tobytes()
@@ -0,0 +1,293 @@
+'''
+Batched environment running many headless games at once for agents and difficulty tuning.
+
+The games are split across worker processes. Observations are written by the workers straight into shared
+memory NumPy arrays that the caller reads without any copying or pickling; the pipes to the workers only carry
+short commands. Actions are the same INPUT_* bitmasks the window loop builds from pygame.key.get_pressed().
+
+Usage:
+    with VectorEnv(256) as env:
+        observations = env.reset(seed=0)
+        while True:
+            observations, rewards, dones = env.step(actions)
+'''
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+
+from .config import SIM_DT
+from .simulation import GameState, step
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # NumPy is only needed for the batched environment
+
+MAX_ASTEROIDS = 64 # Asteroids per game included in the observation, the rest are left out
+MAX_BULLETS = 32 # Bullets per game included in the observation
+
+def observation_spec(num_envs, max_asteroids=MAX_ASTEROIDS, max_bullets=MAX_BULLETS):
+    '''
+    Describes every shared array of a batch.
+    
+    Every array has one row per game. Positions and velocities are in world pixels and pixels per second, with y
+    pointing down. The ship's heading is the unit vector its nose points along, (sin, -cos) of its angle, so it
+    stays bounded and continuous however often the ship turns. Asteroid and bullet rows past the game's count are
+    left over from earlier steps and should be ignored.
+    
+    Arguments:
+        num_envs (int): Number of games.
+        max_asteroids (int): Asteroid slots per game.
+        max_bullets (int): Bullet slots per game.
+    
+    Returns:
+        dict: Maps array name to (shape, dtype).
+    '''
+    return {
+        'ship': ((num_envs, 6), np.float32), # x, y, vx, vy, heading x, heading y
+        'status': ((num_envs, 4), np.int32), # score, wave, lives, ship alive
+        'asteroids': ((num_envs, max_asteroids, 6), np.float32), # x, y, vx, vy, size, letter index (B = 1)
+        'asteroid_count': ((num_envs,), np.int32), # Valid rows of 'asteroids'
+        'bullets': ((num_envs, max_bullets, 5), np.float32), # x, y, vx, vy, life left in seconds
+        'bullet_count': ((num_envs,), np.int32), # Valid rows of 'bullets'
+        'actions': ((num_envs,), np.uint8), # INPUT_* bitmask to apply next step
+        'rewards': ((num_envs,), np.float32), # Score gained during the step
+        'dones': ((num_envs,), np.bool_), # Game over during the step; the game was restarted
+    }
+
+def attach_arrays(spec, blocks):
+    '''
+    Wraps shared memory blocks as NumPy arrays.
+    
+    Arguments:
+        spec (dict): Array shapes and dtypes as returned by observation_spec().
+        blocks (dict): SharedMemory block of every array.
+    
+    Returns:
+        dict: NumPy array of every name, backed by its block.
+    '''
+    return {name: np.ndarray(shape, dtype, buffer=blocks[name].buf) for name, (shape, dtype) in spec.items()}
+
+class EnvSlice:
+    '''
+    The games with indices start to stop of a batch, all run by one process.
+    
+    Arguments:
+        arrays (dict): Shared arrays of the whole batch.
+        start (int): Index of the first game.
+        stop (int): Index after the last game.
+        dt (float): Time step of every frame in seconds.
+        frame_skip (int): Frames simulated per step with the same action.
+    '''
+    def __init__(self, arrays, start, stop, dt, frame_skip):
+        self.arrays = arrays
+        self.start = start
+        self.stop = stop
+        self.dt = dt
+        self.frame_skip = frame_skip
+        self.games = {}
+        self.seeds = {} # Seed of the next game of every index
+    
+    def reset(self, seed):
+        '''
+        Starts a new game at every index. Game i gets seed + i, its restarts seed + i + num_envs and so on.
+        
+        Arguments:
+            seed (int): Seed of the batch.
+        '''
+        num_envs = len(self.arrays['actions'])
+        for index in range(self.start, self.stop):
+            self.seeds[index] = seed + index
+            self.restart(index, num_envs)
+    
+    def restart(self, index, num_envs):
+        '''
+        Replaces a game with a fresh one and writes its observation.
+        '''
+        self.games[index] = GameState(self.seeds[index], show_instructions=False)
+        self.seeds[index] += num_envs
+        self.observe(index)
+    
+    def step(self):
+        '''
+        Advances every game by frame_skip frames using its action from the shared actions array.
+        '''
+        arrays = self.arrays
+        num_envs = len(arrays['actions'])
+        for index in range(self.start, self.stop):
+            state = self.games[index]
+            keys = int(arrays['actions'][index])
+            score = state.score
+            for _ in range(self.frame_skip):
+                step(state, keys, self.dt)
+                if state.game_over:
+                    break
+            arrays['rewards'][index] = state.score - score
+            arrays['dones'][index] = state.game_over
+            if state.game_over:
+                self.restart(index, num_envs)
+            else:
+                self.observe(index)
+    
+    def observe(self, index):
+        '''
+        Writes the observation of one game into the shared arrays.
+        '''
+        arrays = self.arrays
+        state = self.games[index]
+        # The angle itself grows without bound while turning, the direction it points in does not
+        angle = math.radians(state.ship_angle)
+        arrays['ship'][index] = (state.ship_pos[0], state.ship_pos[1], state.ship_velocity[0],
+                                 state.ship_velocity[1], math.sin(angle), -math.cos(angle))
+        arrays['status'][index] = (state.score, state.current_wave, state.lives, state.ship_alive)
+        
+        asteroids = arrays['asteroids'][index]
+        count = min(len(state.asteroids), len(asteroids))
+        for slot in range(count):
+            asteroid = state.asteroids[slot]
+            asteroids[slot] = (asteroid.x, asteroid.y, asteroid.vx, asteroid.vy, asteroid.size,
+                               ord(asteroid.letter) - ord('A'))
+        arrays['asteroid_count'][index] = count
+        
+        bullets = arrays['bullets'][index]
+        count = min(len(state.bullets), len(bullets))
+        for slot in range(count):
+            bullet = state.bullets[slot]
+            bullets[slot] = (bullet.x, bullet.y, bullet.vx, bullet.vy, bullet.life)
+        arrays['bullet_count'][index] = count
+
+def worker(connection, blocks, spec, start, stop, dt, frame_skip):
+    '''
+    Runs the commands sent by a VectorEnv for one slice of its games until told to close.
+    '''
+    games = EnvSlice(attach_arrays(spec, blocks), start, stop, dt, frame_skip)
+    while True:
+        command, args = connection.recv()
+        if command == 'close':
+            break
+        getattr(games, command)(*args) # 'reset' or 'step'
+        connection.send(None) # Done, the shared arrays are up to date
+    connection.close()
+
+class VectorEnv:
+    '''
+    N headless games stepped together by a pool of worker processes.
+    
+    reset() and step() return the shared observation arrays themselves. They are only valid until the next
+    call, so copy anything that has to be kept. Finished games are restarted right away with a new seed; their
+    dones entry is True for that step and the observation already belongs to the new game.
+    
+    Arguments:
+        num_envs (int): Number of games.
+        num_workers (int or None): Worker processes, by default one per CPU. 0 runs every game in this process.
+        frame_skip (int): Frames simulated per step with the same action.
+        dt (float): Time step of every frame in seconds.
+        max_asteroids (int): Asteroid slots per game in the observation.
+        max_bullets (int): Bullet slots per game in the observation.
+    '''
+    def __init__(self, num_envs, num_workers=None, frame_skip=1, dt=SIM_DT, max_asteroids=MAX_ASTEROIDS,
+                 max_bullets=MAX_BULLETS):
+        if np is None:
+            raise ImportError("VectorEnv requires NumPy (pip install numpy)")
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
+        num_workers = min(num_workers, num_envs)
+        self.num_envs = num_envs
+        spec = observation_spec(num_envs, max_asteroids, max_bullets)
+        self.blocks = {name: shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                       for name, (shape, dtype) in spec.items()}
+        self.arrays = attach_arrays(spec, self.blocks)
+        for array in self.arrays.values():
+            array.fill(0)
+        
+        self.local = None # Games run in this process when there are no workers
+        self.connections = []
+        self.processes = []
+        if num_workers == 0:
+            self.local = EnvSlice(self.arrays, 0, num_envs, dt, frame_skip)
+        for worker_index in range(num_workers):
+            # Contiguous, nearly equal slices
+            start = num_envs * worker_index // num_workers
+            stop = num_envs * (worker_index + 1) // num_workers
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=worker, args=(child, self.blocks, spec, start, stop, dt, frame_skip),
+                                              daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+    
+    def observations(self):
+        '''
+        Returns the observation arrays.
+        
+        Returns:
+            dict: 'ship', 'status', 'asteroids', 'asteroid_count', 'bullets' and 'bullet_count' arrays, each with
+            one row per game, laid out as described in observation_spec().
+        '''
+        return {name: self.arrays[name] for name in ('ship', 'status', 'asteroids', 'asteroid_count', 'bullets',
+                                                     'bullet_count')}
+    
+    def run(self, command, *args):
+        '''
+        Calls an EnvSlice method in every worker and waits until all of them finished it.
+        '''
+        if self.local is not None:
+            getattr(self.local, command)(*args)
+            return
+        for connection in self.connections:
+            connection.send((command, args))
+        for connection in self.connections:
+            connection.recv()
+    
+    def reset(self, seed=0):
+        '''
+        Starts a new game in every slot.
+        
+        Arguments:
+            seed (int): Game i is seeded with seed + i.
+        
+        Returns:
+            dict: The observation arrays.
+        '''
+        self.run('reset', seed)
+        return self.observations()
+    
+    def step(self, actions):
+        '''
+        Advances every game with its action.
+        
+        Arguments:
+            actions: One combination of the INPUT_* flags per game, or a single one for every game.
+        
+        Returns:
+            tuple: (observations, rewards, dones) arrays.
+        '''
+        self.arrays['actions'][:] = actions
+        self.run('step')
+        return self.observations(), self.arrays['rewards'], self.arrays['dones']
+    
+    def close(self):
+        '''
+        Stops the workers and frees the shared memory.
+        '''
+        for connection in self.connections:
+            connection.send(('close', ()))
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+        self.arrays = {}
+        for block in self.blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                pass # The caller still holds an observation array; the memory is freed with it
+            block.unlink()
+        self.blocks = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,44 @@
+'''
+Mapping of the logical playfield onto the surface the game is drawn on.
+'''
+from .config import WIDTH, HEIGHT, RENDER_SCALE
+
+class Viewport:
+    '''
+    Resolution the game is drawn at, relative to the WIDTH x HEIGHT playfield the simulation runs in.
+    
+    Draw functions multiply playfield positions and pixel sizes by scale, so the game can be drawn at a lower or
+    higher resolution than the playfield without changing how it plays. Renderers that keep surfaces of the
+    drawing's size rebuild them when size changes.
+    
+    Arguments:
+        scale (float): Render resolution relative to the playfield.
+    '''
+    def __init__(self, scale=RENDER_SCALE):
+        self.set_scale(scale)
+    
+    def set_scale(self, scale):
+        '''
+        Changes the render resolution.
+        
+        Arguments:
+            scale (float): Render resolution relative to the playfield.
+        '''
+        self.scale = scale
+        self.width = max(1, round(WIDTH * scale))
+        self.height = max(1, round(HEIGHT * scale))
+        self.size = (self.width, self.height)
+    
+    def pixels(self, length):
+        '''
+        Scales a length such as a line width or a radius to whole pixels, never less than one.
+        
+        Arguments:
+            length (float): Length at a scale of 1.
+        
+        Returns:
+            int: Length in render pixels.
+        '''
+        return max(1, round(length * self.scale))
+
+viewport = Viewport() # Render resolution shared by every draw function, set by the window loop
@@ -0,0 +1,49 @@
+'''
+Frame capture must drop frames rather than make the game wait for the worker, and keep every frame when
+told to wait.
+'''
+import os
+import time
+import signal
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from alphastroid.capture import FrameCapture
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGSTOP'), reason="needs SIGSTOP to stall the worker")
+def test_stalled_worker_drops_frames_instead_of_blocking(tmp_path):
+    surface = pygame.Surface((60, 40), depth=32)
+    capture = FrameCapture(str(tmp_path), 'png', buffers=2)
+    capture.capture(surface)
+    deadline = time.perf_counter() + 30
+    while capture.encoded == 0 and time.perf_counter() < deadline:
+        time.sleep(0.01) # Let the worker start up and hand the first buffer back
+    assert capture.encoded == 1
+    time.sleep(0.2) # And let its queue's feeder thread, which stops with it, pass the buffer on
+    os.kill(capture.worker.pid, signal.SIGSTOP)
+    try:
+        # Both buffers fill up, then every frame is dropped; a blocking capture would hang here instead
+        results = [capture.capture(surface) for _ in range(10)]
+    finally:
+        os.kill(capture.worker.pid, signal.SIGCONT)
+    capture.close()
+    assert results == [True, True] + [False] * 8
+    stats = capture.stats()
+    assert (stats['frames'], stats['captured'], stats['dropped'], stats['encoded']) == (11, 3, 8, 3)
+    assert sorted(os.listdir(tmp_path)) == [f"frame_{frame:06d}.png" for frame in range(3)]
+
+def test_waiting_capture_keeps_every_frame(tmp_path):
+    surface = pygame.Surface((60, 40), depth=32)
+    path = str(tmp_path / "video.rgb")
+    capture = FrameCapture(path, 'raw', buffers=2, wait=True)
+    for frame in range(10):
+        surface.fill((frame, 0, 0))
+        capture.capture(surface)
+    capture.close()
+    assert capture.stats()['dropped'] == 0
+    assert os.path.getsize(path) == 10 * 60 * 40 * 3
+    with open(path, 'rb') as file:
+        data = file.read()
+    assert data[:3] == bytes((0, 0, 0)) and data[-3:] == bytes((9, 0, 0))
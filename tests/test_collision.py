@@ -0,0 +1,37 @@
+'''
+Hits across the wrapping edges of a world larger than the playfield.
+'''
+import random
+
+from alphastroid.collision import SpatialHash, find_ship_collision, collide_bullets_with_asteroids
+from alphastroid.entities import Asteroid, Bullet, Pool
+
+WORLD = (1800, 1200)
+
+def make_pool(factory, *entities):
+    pool = Pool(factory, 4)
+    for values in entities:
+        pool.acquire().set(*values)
+    return pool
+
+def test_ship_hits_an_asteroid_across_the_seam():
+    asteroids = make_pool(Asteroid, (1795, 600, 0, 0, 'B', 30, 0, 0))
+    grid = SpatialHash(*WORLD)
+    # The ship is 10 pixels from the asteroid's center, the other way around the world's left edge
+    assert find_ship_collision(asteroids, [5, 600], grid=grid, focus=True, world=WORLD) is asteroids[0]
+    # Without a world the positions are compared as they are, 1790 pixels apart
+    assert find_ship_collision(asteroids, [5, 600], grid=grid, focus=True) is None
+
+def test_bullet_hits_an_asteroid_across_the_seam():
+    for bullet_y, asteroid_y in ((3, 1195), (1197, 4)):
+        asteroids = make_pool(Asteroid, (900, asteroid_y, 0, 0, 'B', 30, 0, 0))
+        bullets = make_pool(Bullet, (900, bullet_y, 0, 0, 1))
+        destroyed = collide_bullets_with_asteroids(bullets, asteroids, random.Random(0), grid=SpatialHash(*WORLD),
+                                                   focus=[900, 600], world=WORLD)
+        assert destroyed == 1
+        assert len(bullets) == 0 and len(asteroids) == 0
+
+def test_far_asteroid_is_not_hit():
+    asteroids = make_pool(Asteroid, (1795, 600, 0, 0, 'B', 30, 0, 0))
+    grid = SpatialHash(*WORLD)
+    assert find_ship_collision(asteroids, [40, 600], grid=grid, focus=True, world=WORLD) is None
@@ -0,0 +1,24 @@
+'''
+Drawing debris near the edges of the view.
+'''
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from alphastroid.render import DebrisRenderer, camera
+from alphastroid.simulation import GameState
+from alphastroid.viewport import viewport
+
+def fragment(x, y):
+    return {'start': [x, y], 'end': [x + 10, y + 5], 'vx': 0, 'vy': 0, 'transparency': 200}
+
+def test_debris_just_past_the_bottom_edge_draws_nothing():
+    camera.follow(GameState(0, show_instructions=False))
+    surface = pygame.Surface(viewport.size)
+    renderer = DebrisRenderer()
+    # Within CULL_MARGIN of the view, so not culled, but every line misses the overlay
+    assert renderer.draw(surface, [fragment(300, 410), fragment(200, 440)]) == []
+    assert renderer.draw(surface, [fragment(300, 380)]) != []
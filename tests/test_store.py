@@ -0,0 +1,25 @@
+'''
+Games with the NumPy entity store play exactly like games with the usual pools.
+'''
+import pytest
+
+pytest.importorskip("numpy")
+
+from alphastroid.simulation import GameState, step, demo_input, SIM_DT
+
+def entities(state):
+    asteroids = [(asteroid.x, asteroid.y, asteroid.angle, asteroid.letter, asteroid.size) for asteroid in state.asteroids]
+    bullets = [(bullet.x, bullet.y, bullet.life) for bullet in state.bullets]
+    return asteroids, bullets
+
+@pytest.mark.parametrize("world_size", [(600, 400), (1800, 1200)])
+@pytest.mark.parametrize("precise_collisions", [False, True])
+def test_store_plays_like_the_pools(world_size, precise_collisions):
+    pools = GameState(3, False, precise_collisions, world_size, entity_store=False)
+    store = GameState(3, False, precise_collisions, world_size, entity_store=True)
+    for frame in range(3000):
+        keys = demo_input(frame)
+        step(pools, keys, SIM_DT)
+        step(store, keys, SIM_DT)
+        assert entities(store) == entities(pools)
+    assert (store.score, store.current_wave, store.lives) == (pools.score, pools.current_wave, pools.lives)